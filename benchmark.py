@@ -0,0 +1,204 @@
+"""
+Benchmarks for spellcheck.py, covering each phase of a spell check run:
+- load: ProcessFiles.process_input() on the bundled files and on synthetic corpora made of repeated copies of 2600.txt
+- build: bulk Trie.add() of the whole dictionary, for each requested Trie backend
+- lookup: Trie.__contains__() for dictionary words (hits) and for misspelled dictionary words (misses)
+- end to end: loading both files, building the SpellCheck and checking every input word
+
+Every benchmark is run a few times untimed (warmup), then timed for a number of repetitions, then run once more
+under tracemalloc to record its peak memory. The results are written as JSON, together with the Python version
+and git commit, so runs can be compared across commits.
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+from spellcheck import ProcessFiles, SpellCheck, TRIE_BACKENDS
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def command_line_help():
+    """
+    This is a simple command line help directory describing the benchmark options.
+    :return: parsed command line arguments
+    """
+
+    parser = argparse.ArgumentParser(prog='benchmark',
+                                     usage='python %(prog)s.py [options]',
+                                     description='''Benchmarks for the Spell Checking Python3 script.''')
+    parser.add_argument('-d', '--dictionary', type=str, default=os.path.join(HERE, 'american-english'),
+                        help='The dictionary file used for the build and lookup benchmarks.')
+    parser.add_argument('-i', '--input', type=str, default=os.path.join(HERE, '2600.txt'),
+                        help='The input file used for the load and end to end benchmarks.')
+    parser.add_argument('-b', '--backends', nargs='+', choices=sorted(TRIE_BACKENDS), default=['trie'],
+                        help='The Trie backends to benchmark.')
+    parser.add_argument('-s', '--scales', type=int, nargs='*', default=[4],
+                        help='Sizes of the synthetic corpora, as a number of copies of the input file.')
+    parser.add_argument('-w', '--warmup', type=int, default=1, help='Untimed runs before timing each benchmark.')
+    parser.add_argument('-r', '--repetitions', type=int, default=5, help='Timed runs of each benchmark.')
+    parser.add_argument('-l', '--lookups', type=int, default=10000, help='Number of words in the lookup benchmarks.')
+    parser.add_argument('-o', '--output', type=str, help='The JSON file to write, standard output by default.')
+
+    return parser.parse_args()
+
+
+def percentile(values, fraction):
+    """
+    The percentile function picks the value below which the given fraction of the sorted values fall.
+    :param values: sorted list of values
+    :param fraction: fraction between 0 and 1
+    :return: the percentile value
+    """
+
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_benchmark(name, function, warmup, repetitions, **details):
+    """
+    The run_benchmark function times a benchmark function and measures its peak memory.
+    :param name: name of the benchmark in the results
+    :param function: function to call without arguments
+    :param warmup: number of untimed calls
+    :param repetitions: number of timed calls
+    :param details: extra fields recorded with the result, such as the file or the number of operations
+    :return: dict of the benchmark results, durations in seconds
+    """
+
+    for _ in range(warmup):
+        function()
+
+    durations = []
+    for _ in range(repetitions):
+        start = time.perf_counter_ns()
+        function()
+        durations.append((time.perf_counter_ns() - start) / 1e9)
+    durations.sort()
+
+    tracemalloc.start()
+    try:
+        function()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    result = {'name': name, 'warmup': warmup, 'repetitions': repetitions, 'min': durations[0],
+              'median': statistics.median(durations), 'p99': percentile(durations, 0.99),
+              'peak_memory_bytes': peak_memory}
+    result.update(details)
+    print('{}: median {:.4f} s, peak {:.1f} MB'.format(name, result['median'], peak_memory / 1e6), file=sys.stderr)
+
+    return result
+
+
+def scaled_corpus(input_file, scale, directory):
+    """
+    The scaled_corpus function writes a synthetic corpus made of scale copies of the input file.
+    :param input_file: path of the file to repeat
+    :param scale: number of copies
+    :param directory: directory the corpus is written to
+    :return: path of the synthetic corpus
+    """
+
+    corpus_file = os.path.join(directory, 'corpus_x{}.txt'.format(scale))
+    with open(input_file, 'rb') as source:
+        content = source.read()
+    with open(corpus_file, 'wb') as corpus:
+        for _ in range(scale):
+            corpus.write(content)
+
+    return corpus_file
+
+
+def misspell(words, generator):
+    """
+    The misspell function replaces one letter of each word with a digit, which makes every word a dictionary miss
+    that still shares a prefix with real words.
+    :param words: list of dictionary words
+    :param generator: random.Random used to pick the letters
+    :return: list of misspelled words
+    """
+
+    misspelled = []
+    for word in words:
+        position = generator.randrange(len(word))
+        misspelled.append(word[:position] + '0' + word[position + 1:])
+
+    return misspelled
+
+
+def git_commit():
+    """
+    The git_commit function identifies the benchmarked code.
+    :return: the current git commit hash, or None outside a git checkout
+    """
+
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=HERE, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    """
+    The main function runs every benchmark and writes the JSON results.
+    """
+
+    args = command_line_help()
+    settings = {'warmup': args.warmup, 'repetitions': args.repetitions}
+    results = []
+
+    dictionary_words = sorted(ProcessFiles(args.dictionary).process_input())
+    generator = random.Random(0)
+    hits = generator.sample(dictionary_words, min(args.lookups, len(dictionary_words)))
+    misses = misspell(hits, generator)
+
+    with tempfile.TemporaryDirectory() as directory:
+        load_files = [args.dictionary, args.input]
+        load_files += [scaled_corpus(args.input, scale, directory) for scale in args.scales]
+        for load_file in load_files:
+            results.append(run_benchmark('load', ProcessFiles(load_file).process_input,
+                                         file=os.path.basename(load_file), bytes=os.path.getsize(load_file),
+                                         **settings))
+
+    for backend in args.backends:
+        def build():
+            return SpellCheck(dictionary_words, backend).words
+
+        results.append(run_benchmark('build', build, backend=backend, words=len(dictionary_words), **settings))
+
+        dictionary = build()
+        for name, words in (('lookup_hit', hits), ('lookup_miss', misses)):
+            results.append(run_benchmark(name, lambda: [word in dictionary for word in words],
+                                         backend=backend, lookups=len(words), **settings))
+
+        def end_to_end():
+            check_spelling = SpellCheck(ProcessFiles(args.dictionary).process_input(), backend)
+            return check_spelling.check_many(ProcessFiles(args.input).process_input())
+
+        results.append(run_benchmark('end_to_end', end_to_end, backend=backend,
+                                     file=os.path.basename(args.input), **settings))
+
+    report = {'commit': git_commit(), 'python': platform.python_version(), 'platform': platform.platform(),
+              'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'results': results}
+
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
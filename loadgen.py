@@ -0,0 +1,168 @@
+"""
+Load generator for 'python spellcheck.py serve DICT'.
+
+Opens a number of keep-alive connections to the server and keeps a fixed number of pipelined requests in flight on
+each of them, for a fixed duration. Each request checks (or asks suggestions for) one word of an input file. The
+latency of a request is measured from the moment it is written until its response has been read, so with
+pipelining it includes the time spent queued behind the requests ahead of it. Reports requests per second and the
+p50/p90/p99/p99.9 latencies.
+"""
+
+import sys
+import asyncio
+import argparse
+import itertools
+import os
+import time
+import urllib.parse
+
+from spellcheck import ProcessFiles
+from benchmark import percentile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def command_line_help():
+    """
+    This is a simple command line help directory describing the load generator options.
+    :return: parsed command line arguments
+    """
+
+    parser = argparse.ArgumentParser(prog='loadgen',
+                                     usage='python %(prog)s.py [options]',
+                                     description='''Load generator for the spell checking server.''')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='The address of the server.')
+    parser.add_argument('-p', '--port', type=int, default=8080, help='The port of the server.')
+    parser.add_argument('-i', '--input', type=str, default=os.path.join(HERE, '2600.txt'),
+                        help='The file whose words are sent to the server.')
+    parser.add_argument('-c', '--connections', type=int, default=8, help='The number of concurrent connections.')
+    parser.add_argument('-P', '--pipeline', type=int, default=4,
+                        help='The number of requests in flight on each connection.')
+    parser.add_argument('-d', '--duration', type=float, default=10, help='How long to send requests, in seconds.')
+    parser.add_argument('-e', '--endpoint', choices=['check', 'suggest'], default='check',
+                        help='The API endpoint to load.')
+
+    return parser.parse_args()
+
+
+async def read_response(reader):
+    """
+    The read_response function reads one HTTP response off the connection.
+    :param reader: asyncio StreamReader of the connection
+    :return: HTTP status of the response
+    """
+
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('The server closed the connection')
+
+    content_length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            content_length = int(value)
+    await reader.readexactly(content_length)
+
+    return int(status_line.split()[1])
+
+
+async def run_connection(args, requests, deadline, latencies, errors):
+    """
+    The run_connection function sends pipelined requests on one connection until the deadline, keeping
+    args.pipeline requests in flight, and records the latency of every successful one.
+    :param args: parsed command line arguments
+    :param requests: shared iterator of encoded requests
+    :param deadline: time.perf_counter() value at which to stop sending
+    :param latencies: list receiving the latency of each request, in seconds
+    :param errors: list receiving the status of each failed request
+    """
+
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    in_flight = []
+
+    try:
+        while True:
+            while len(in_flight) < args.pipeline and time.perf_counter() < deadline:
+                writer.write(next(requests))
+                in_flight.append(time.perf_counter())
+            if not in_flight:
+                break
+
+            await writer.drain()
+            status = await read_response(reader)
+            sent = in_flight.pop(0)
+            if status == 200:
+                latencies.append(time.perf_counter() - sent)
+            else:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+def encode_requests(args, words):
+    """
+    The encode_requests function prepares one HTTP request per word, cycling through the words forever.
+    :param args: parsed command line arguments
+    :param words: list of words to send
+    :return: iterator of encoded requests
+    """
+
+    if args.endpoint == 'check':
+        targets = ['/check?words=' + urllib.parse.quote(word) for word in words]
+    else:
+        targets = ['/suggest?max_distance=1&word=' + urllib.parse.quote(word) for word in words]
+
+    encoded = ['GET {} HTTP/1.1\r\nHost: {}\r\n\r\n'.format(target, args.host).encode('latin-1')
+               for target in targets]
+
+    return itertools.cycle(encoded)
+
+
+async def run(args):
+    """
+    The run function drives every connection concurrently and prints the report.
+    :param args: parsed command line arguments
+    """
+
+    words = sorted(ProcessFiles(args.input).process_input())
+    if not words:
+        print('The input file has no words to send!')
+        return
+
+    requests = encode_requests(args, words)
+    latencies = []
+    errors = []
+
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(*(run_connection(args, requests, deadline, latencies, errors)
+                           for _ in range(args.connections)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    total = len(latencies) + len(errors)
+    print('{} requests in {:.2f} s over {} connections with {} pipelined: {:.0f} requests/s, {} errors'.format(
+        total, elapsed, args.connections, args.pipeline, total / elapsed, len(errors)))
+    if latencies:
+        print('latency: ' + ', '.join('p{} {:.3f} ms'.format(label, 1000 * percentile(latencies, fraction))
+                                      for label, fraction in (('50', 0.5), ('90', 0.9), ('99', 0.99), ('99.9', 0.999))))
+
+
+def main():
+    """
+    The main function runs the load and reports a server that can't be reached.
+    """
+
+    args = command_line_help()
+    try:
+        asyncio.run(run(args))
+    except ConnectionError as error:
+        print('Could not load the server at {}:{}: {}'.format(args.host, args.port, error))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
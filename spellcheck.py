@@ -24,9 +24,86 @@ Considerations:
 """
 
 import sys
+import os
 import re
 import argparse
+import bisect
+import heapq
+import asyncio
 import time
+import tracemalloc
+import random
+import multiprocessing
+import mmap
+import struct
+import zlib
+import codecs
+import locale
+import gzip
+import json
+import math
+import urllib.parse
+from array import array
+from contextlib import contextmanager
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+INDEX_MAGIC = b'SPCI'
+INDEX_VERSION = 1
+INDEX_BYTE_ORDER = 0 if sys.byteorder == 'little' else 1
+INDEX_HEADER = struct.Struct('<4sHHIIII')
+
+WORD_PATTERN = re.compile(r'\w+')
+CHUNK_SIZE = 1 << 16
+WHITESPACE_BYTES = re.compile(rb'\s')
+
+COUNTS_MAGIC = 'spellcheck-counts'
+COUNTS_VERSION = 1
+CORRECTION_LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+SUGGESTION_STRATEGIES = ('trie', 'symspell', 'bktree', 'automaton', 'batch')
+
+BK_TREE_MAGIC = 'spellcheck-bktree'
+BK_TREE_VERSION = 1
+
+BLOOM_PATTERN_BITS = 12
+BLOOM_PATTERNS = 1 << BLOOM_PATTERN_BITS
+
+HTTP_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+SERVER_MAX_DISTANCE = 2
+SERVER_STRATEGIES = ('trie', 'automaton')
+
+
+def positive_int(value):
+    """
+    The positive_int function parses a command line count which has to be at least 1.
+    :param value: the command line value
+    :return: the count
+    """
+
+    count = int(value)
+    if count < 1:
+        raise argparse.ArgumentTypeError('{} is not a positive number'.format(value))
+
+    return count
+
+
+def false_positive_rate(value):
+    """
+    The false_positive_rate function parses the command line false positive rate of a Bloom filter.
+    :param value: the command line value
+    :return: the rate, strictly between 0 and 1
+    """
+
+    rate = float(value)
+    if not 0 < rate < 1:
+        raise argparse.ArgumentTypeError('{} is not between 0 and 1'.format(value))
+
+    return rate
 
 
 def command_line_help():
@@ -38,19 +115,188 @@ def command_line_help():
     """
 
     parser = argparse.ArgumentParser(prog='spellcheck',
-                                     usage='python %(prog)s.py i d',
+                                     usage='python %(prog)s.py i d [options]\n'
+                                           '       python %(prog)s.py COMMAND ...',
                                      description='''A Spell Checking Python3 script on Command Line.''',
-                                     epilog="""Have a great weekend!""")
-    parser.add_argument('i', nargs='*', type=str, default='Inputfile',
+                                     formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     epilog="""commands (python spellcheck.py COMMAND -h lists their options):
+  compile    Compile a dictionary file into a memory-mapped index.
+  serve      Serve spell checks over a local HTTP/JSON API.
+  stats      Report the structure and memory of the dictionary Trie.
+  backends   Measure the dictionary backends and pick one.
+  complete   Complete prefixes with the most frequent dictionary words.
+  symspell   Measure the symmetric delete suggestion index.
+  bktree     Compare BK-tree and Trie walk suggestions.
+
+The command names are reserved as the first argument: an input file named like
+one of them has to be given with a directory, such as ./stats.
+
+Have a great weekend!""")
+    parser.add_argument('i', nargs='?', type=str,
                         help='The file that you intend to compare against the dictionary.')
-    parser.add_argument('d', nargs='*', type=str, default='Dictionaryfile',
+    parser.add_argument('d', nargs='?', type=str,
                         help='The file that you intend to use as the dictionary.')
+    parser.add_argument('-b', '--backend', choices=sorted(TRIE_BACKENDS) + ['auto'], default='trie',
+                        help='The Trie implementation used to store the dictionary, or auto to pick the fastest one '
+                             'fitting the memory budget.')
+    parser.add_argument('--memory-budget', type=float, metavar='MB',
+                        help='The memory the dictionary may use when the backend is auto.')
+    parser.add_argument('--index', type=str,
+                        help='A compiled dictionary index to load instead of building the Trie, rebuilt if stale.')
+    parser.add_argument('-j', '--jobs', type=positive_int, default=1,
+                        help='The number of processes used to check the input words.')
+    parser.add_argument('-c', '--correct', type=str, metavar='CORPUS',
+                        help='Print the most probable correction of each misspelled word, ranked by the word '
+                             'frequencies of the corpus (cached in CORPUS.counts).')
+    parser.add_argument('-q', '--quick-check', type=int, metavar='LINES',
+                        help='Only check the format of this many lines spread across the dictionary file.')
+    parser.add_argument('--filter', type=false_positive_rate, metavar='RATE',
+                        help='Reject most misspelled words with a Bloom filter of this false positive rate, such as '
+                             '0.01, before searching the Trie.')
+    parser.add_argument('--hit-set', type=int, default=0, metavar='SIZE',
+                        help='Remember up to this many correctly spelled words in a hash set to skip their Trie '
+                             'search.')
+    parser.add_argument('-p', '--positions', action='store_true',
+                        help='Stream every misspelled occurrence with its line, column and byte offset, in file '
+                             'order, instead of the distinct misspelled words.')
+    parser.add_argument('-m', '--metrics', choices=sorted(METRICS_SINKS) + ['none'], default='text',
+                        help='How the time spent in each phase is reported on standard error.')
 
     args = parser.parse_args()
 
     return args
 
 
+class DictionaryFormatError(ValueError):
+    """
+    The DictionaryFormatError exception reports the first line of a dictionary file which doesn't hold exactly one
+    word, with its line number (None when the line was found by a sampled check).
+    """
+
+    def __init__(self, message, line_number):
+        super().__init__(message)
+        self.line_number = line_number
+
+
+def check_dictionary_line(line, line_number):
+    """
+    The check_dictionary_line function raises a DictionaryFormatError unless the line holds exactly one word.
+    :param line: a line of the dictionary file
+    :param line_number: number of the line, starting at 1
+    """
+
+    if len(line.split()) != 1:
+        raise DictionaryFormatError('Expected one word per line at line {} of the dictionary file, found {!r}'
+                                    .format(line_number, line.strip()), line_number)
+
+
+class Span:
+    """
+    The Span class records one timed phase: its name, its start and duration from time.perf_counter_ns(), and a
+    count of the items it processed (bytes read, words tokenized, words looked up...).
+    """
+
+    def __init__(self, name, start_ns, duration_ns=0, count=0):
+        self.name = name
+        self.start_ns = start_ns
+        self.duration_ns = duration_ns
+        self.count = count
+
+    def as_dict(self):
+        return {'name': self.name, 'start_ns': self.start_ns, 'duration_ns': self.duration_ns, 'count': self.count}
+
+
+class Instrumentation:
+    """
+    The Instrumentation class times named phases as Spans and hands every finished Span to its sinks, while also
+    keeping per-name totals for report(). Sinks are any objects with an emit(span) method, such as TextSink,
+    JsonLinesSink and MemorySink.
+    """
+
+    def __init__(self, sinks=()):
+        self.sinks = list(sinks)
+        self.totals = OrderedDict()
+
+    @contextmanager
+    def span(self, name, count=0):
+        """
+        The span function times the body of a with statement. The yielded Span's count can be set inside the body.
+        :param name: name of the phase
+        :param count: number of items processed, if already known
+        :return: context manager yielding the Span
+        """
+
+        span = Span(name, time.perf_counter_ns(), count=count)
+        try:
+            yield span
+        finally:
+            span.duration_ns = time.perf_counter_ns() - span.start_ns
+            self.record(span)
+
+    def record(self, span):
+        """
+        The record function adds a finished Span to the totals and emits it to every sink.
+        :param span: the finished Span
+        """
+
+        calls, duration_ns, count = self.totals.get(span.name, (0, 0, 0))
+        self.totals[span.name] = (calls + 1, duration_ns + span.duration_ns, count + span.count)
+        for sink in self.sinks:
+            sink.emit(span)
+
+    def report(self):
+        """
+        The report function summarizes the recorded Spans by name, in the order they were first recorded.
+        :return: dict mapping each span name to its number of calls, total duration_ns and total count
+        """
+
+        return {name: {'calls': calls, 'duration_ns': duration_ns, 'count': count}
+                for name, (calls, duration_ns, count) in self.totals.items()}
+
+
+class TextSink:
+    """
+    The TextSink class writes one human readable line per Span, to standard error by default.
+    """
+
+    def __init__(self, file=None):
+        self.file = file
+
+    def emit(self, span):
+        print('{}: {:.3f} ms ({} items)'.format(span.name, span.duration_ns / 1e6, span.count),
+              file=self.file if self.file is not None else sys.stderr)
+
+
+class JsonLinesSink:
+    """
+    The JsonLinesSink class writes one JSON object per Span and line, to standard error by default.
+    """
+
+    def __init__(self, file=None):
+        self.file = file
+
+    def emit(self, span):
+        print(json.dumps(span.as_dict()), file=self.file if self.file is not None else sys.stderr)
+
+
+class MemorySink:
+    """
+    The MemorySink class keeps every Span in a list, for library users and tests.
+    """
+
+    def __init__(self):
+        self.spans = []
+
+    def emit(self, span):
+        self.spans.append(span)
+
+
+METRICS_SINKS = {
+    'text': TextSink,
+    'json': JsonLinesSink,
+}
+
+
 class ProcessFiles(object):
     """
     The Processfiles class takes any file input and processes them into a set data type
@@ -60,46 +306,224 @@ class ProcessFiles(object):
     to correct for duplicate entries, decreasing processing time by minimizing loop iterations.
     """
 
-    def __init__(self, input_file):
+    def __init__(self, input_file, instrumentation=None):
         self.input_file = input_file
+        self.instrumentation = instrumentation
+        self.read_ns = 0
+        self.characters_read = 0
 
-    def check_file_format(self):
+    def check_file_format(self, sample=None):
         """
-        The check_file_format funciton accepts a file and reads each line of the file into a list.
-        If the ratio of lines to words is not 1, then it can be safely assumed that the user mixed the dictionary
-        and input files during the script call.
-        :return: ratio of lines to words
+        The check_file_format function makes sure that every line of the dictionary file holds exactly one word.
+        If it doesn't, it can be safely assumed that the user mixed the dictionary and input files during the script
+        call. The check stops at the first offending line. With sample, only that many lines spread evenly across
+        the file are read (seeking to each one), which is a quick sanity check for huge dictionaries.
+        :param sample: number of lines to check, or None to check the whole file
+        :return: True when the checked lines are formatted correctly
         """
-        file = open(self.input_file)
 
-        number_of_lines = 0
-        number_of_words = 0
-        for line in file:
-            line = line.strip('\n')
+        if sample is None:
+            with open(self.input_file) as file:
+                line_number = 0
+                for line_number, line in enumerate(file, 1):
+                    check_dictionary_line(line, line_number)
+            if line_number == 0:
+                raise DictionaryFormatError('The dictionary file is empty', 0)
+
+            return True
 
-            words = line.split()
-            number_of_lines += 1
-            number_of_words += len(words)
+        size = os.path.getsize(self.input_file)
+        if size == 0:
+            raise DictionaryFormatError('The dictionary file is empty', 0)
 
-        return number_of_lines / number_of_words
+        with open(self.input_file, 'rb') as file:
+            for position in range(sample):
+                offset = size * position // sample
+                file.seek(offset)
+                if offset:
+                    # Skip the rest of the line the offset fell in
+                    file.readline()
+                line_offset = file.tell()
+                line = file.readline()
+                if line and len(line.split()) != 1:
+                    line = line.strip().decode(errors='replace')
+                    raise DictionaryFormatError('Expected one word per line at byte offset {} of the dictionary '
+                                                'file, found {!r}'.format(line_offset, line), None)
 
-    def process_input(self):
+        return True
+
+    def load_dictionary(self, validate=True):
         """
-        The process_input function accepts a file and reads all words from it using the regular expression '\w+'.
-        By finding all words in the file and processing them into lowercase strings, there is a uniform foundation for
-        comparing words from the input file and the dictionary file.
-        :return: word_list, a set of words from the inputted file, set to lower case for comparison
+        The load_dictionary function reads the dictionary file exactly once, validating each line as it goes and
+        collecting its words like process_input does. It stops at the first line which doesn't hold exactly one
+        word, so a mixed up input file is rejected without reading it to the end.
+        :param validate: whether to check the format of each line, skipped after a sampled check_file_format()
+        :return: word_set, a set of words from the dictionary file, set to lower case for comparison
         """
 
+        word_set = set()
+        findall = WORD_PATTERN.findall
+        line_number = 0
+
         with open(self.input_file) as file:
-            file_content = file.read()
+            for line_number, line in enumerate(file, 1):
+                if validate:
+                    check_dictionary_line(line, line_number)
+                word_set.update(word.lower() for word in findall(line))
+
+        if validate and line_number == 0:
+            raise DictionaryFormatError('The dictionary file is empty', 0)
+
+        return word_set
+
+    def tokens(self, chunk_size=CHUNK_SIZE, start=0, stop=None):
+        """
+        The tokens function streams the file in fixed size chunks and yields every word matched by the regular
+        expression '\\w+', set to lower case. Each chunk is cut after its last non-word character: the head is
+        matched in one findall() call, and the tail, which may be the start of a word that continues in the next
+        chunk, is carried over to it. Words are set to lower case only once matched, as lowering a chunk first could
+        turn a word character into non-word ones (such as 'İ' into 'i' and a combining dot). Memory use therefore
+        stays constant regardless of the size of the file, without the cost of one match object per word. With start
+        and stop, only that byte range of the file is read, which byte_ranges() aligns on whitespace so no word is
+        split between two ranges.
+        :param chunk_size: number of bytes read from the file at a time
+        :param start: byte offset to start reading at
+        :param stop: byte offset to stop reading at, the end of the file by default
+        :return: generator of lower case words from the inputted file, in file order
+        """
+
+        findall = WORD_PATTERN.findall
+        decoder = codecs.getincrementaldecoder(locale.getpreferredencoding(False))()
+        remainder = ''
+        self.read_ns = 0
+        self.characters_read = 0
+        with open(self.input_file, 'rb') as file:
+            file.seek(start)
+            position = start
+            while True:
+                size = chunk_size if stop is None else min(chunk_size, stop - position)
+                start_read = time.perf_counter_ns()
+                data = file.read(size) if size > 0 else b''
+                chunk = decoder.decode(data, not data)
+                self.read_ns += time.perf_counter_ns() - start_read
+                self.characters_read += len(chunk)
+                position += len(data)
+
+                chunk = remainder + chunk
+                cut = len(chunk)
+                if data:
+                    while cut and (chunk[cut - 1].isalnum() or chunk[cut - 1] == '_'):
+                        cut -= 1
+                remainder = chunk[cut:]
+                yield from map(str.lower, findall(chunk, 0, cut))
+
+                if not data:
+                    break
+
+    def byte_ranges(self, count):
+        """
+        The byte_ranges function splits the file into about count contiguous byte ranges, moving each boundary
+        forward to the next whitespace byte so that no word straddles two ranges. This holds for ASCII compatible
+        encodings such as UTF-8, where a whitespace byte is never part of a longer character.
+        :param count: number of ranges wanted
+        :return: list of (start, stop) byte offsets covering the whole file, without empty ranges
+        """
+
+        size = os.path.getsize(self.input_file)
+        boundaries = [0]
+        with open(self.input_file, 'rb') as file:
+            for index in range(1, count):
+                offset = max(size * index // count, boundaries[-1])
+                file.seek(offset)
+                while True:
+                    block = file.read(4096)
+                    if not block:
+                        offset = size
+                        break
+                    match = WHITESPACE_BYTES.search(block)
+                    if match:
+                        offset += match.start()
+                        break
+                    offset += len(block)
+                if boundaries[-1] < offset < size:
+                    boundaries.append(offset)
+        boundaries.append(size)
+
+        return [(start, stop) for start, stop in zip(boundaries, boundaries[1:]) if start < stop]
 
-        word_list = re.findall(r'\w+', file_content)
+    def positions(self, chunk_size=CHUNK_SIZE):
+        """
+        The positions function streams the file like tokens() and yields every word together with where it occurs:
+        its line and column, both counted from 1, and the byte offset of its first letter from the start of the
+        file, counted from 0 in the file's encoding. Lines end at '\\n', and line endings are read untranslated so
+        the offsets match the bytes on disk. Offsets are only re-encoded for chunks holding non-ASCII text.
+        :param chunk_size: number of characters read from the file at a time
+        :return: generator of (word, line, column, byte offset) tuples, words set to lower case, in file order
+        """
+
+        buffer = ''
+        # Character and byte offsets of buffer[0] in the file, line of buffer[0] and character offset of its line
+        offset = byte_offset = line_start = 0
+        line = 1
+
+        with open(self.input_file, newline='') as file:
+            encoding = file.encoding
+            while True:
+                chunk = file.read(chunk_size)
+                buffer += chunk
+                buffer_end = len(buffer)
+                ascii_buffer = buffer.isascii()
+
+                # position is the index in buffer that offset, byte_offset and line currently describe
+                position = 0
+                cut = buffer_end
+                for match in WORD_PATTERN.finditer(buffer):
+                    start = match.start()
+                    if chunk and match.end() == buffer_end:
+                        # The word may continue in the next chunk, so it is matched again with it
+                        cut = start
+                        break
+
+                    newlines = buffer.count('\n', position, start)
+                    if newlines:
+                        line += newlines
+                        line_start = offset + buffer.rindex('\n', position, start) + 1 - position
+                    segment = start - position
+                    byte_offset += segment if ascii_buffer else len(buffer[position:start].encode(encoding))
+                    offset += segment
+                    position = start
+
+                    yield match.group().lower(), line, offset - line_start + 1, byte_offset
+
+                newlines = buffer.count('\n', position, cut)
+                if newlines:
+                    line += newlines
+                    line_start = offset + buffer.rindex('\n', position, cut) + 1 - position
+                byte_offset += cut - position if ascii_buffer else len(buffer[position:cut].encode(encoding))
+                offset += cut - position
+                buffer = buffer[cut:]
 
-        word_list = [word.lower() for word in word_list]
-        word_list = [word.strip() for word in word_list]
+                if not chunk:
+                    break
 
-        word_set = set(word_list)
+    def process_input(self):
+        """
+        The process_input function accepts a file and reads all words from it using the regular expression '\w+'.
+        By finding all words in the file and processing them into lowercase strings, there is a uniform foundation for
+        comparing words from the input file and the dictionary file. The words are streamed by tokens() straight into
+        the set, so no intermediate lists of the whole file are built. With instrumentation, the time spent reading
+        the file and the rest of the time spent tokenizing are recorded as 'read' and 'tokenize' spans.
+        :return: word_set, a set of words from the inputted file, set to lower case for comparison
+        """
+
+        start = time.perf_counter_ns()
+        tokens = Counter(self.tokens()) if self.instrumentation is not None else self.tokens()
+        word_set = set(tokens)
+
+        if self.instrumentation is not None:
+            self.instrumentation.record(Span('read', start, self.read_ns, self.characters_read))
+            self.instrumentation.record(Span('tokenize', start + self.read_ns,
+                                             time.perf_counter_ns() - start - self.read_ns, sum(tokens.values())))
 
         return word_set
 
@@ -108,29 +532,120 @@ class Node:
     """
     The Node class initializes each node of the Trie. These nodes are the base unit which accept
     each character of the string and act as the base unit of the Trie data structure.
+    Nodes use __slots__ instead of a per-instance __dict__, and their children are stored as compactly as their
+    number allows: None for a leaf, a (letter, child) tuple for a single child, and a dict from two children on.
+    Most Nodes of a word Trie are leaves or links of single child chains, so few of them need a dict.
     """
 
+    __slots__ = ('value', 'children', 'end', 'frequency', 'best')
+
     def __init__(self, value):
         self.value = value
-        self.children = dict()
+        self.children = None
         self.end = False
+        # Frequency of the word ending on this Node, and the highest frequency of any word below it (see complete())
+        self.frequency = 0
+        self.best = 0
 
-    def __getitem__(self, key):
-        if key in self.children:
-            return self.children[key]
+    def get(self, key):
+        """
+        The get function returns the child reached through the letter.
+        :param key: the letter
+        :return: the child Node, or None when there is no such child
+        """
 
-        return None
+        children = self.children
+        if children is None:
+            return None
+        if children.__class__ is tuple:
+            return children[1] if children[0] == key else None
+        return children.get(key)
+
+    __getitem__ = get
 
     def __setitem__(self, key, value):
-        self.children[key] = value
+        children = self.children
+        if children is None or (children.__class__ is tuple and children[0] == key):
+            self.children = (key, value)
+        elif children.__class__ is tuple:
+            self.children = {children[0]: children[1], key: value}
+        else:
+            children[key] = value
+
+    def __delitem__(self, key):
+        children = self.children
+        if children.__class__ is tuple and children[0] == key:
+            self.children = None
+        elif children.__class__ is dict:
+            del children[key]
+            if len(children) == 1:
+                self.children = next(iter(children.items()))
+        else:
+            raise KeyError(key)
 
     def __contains__(self, value):
-        return value in self.children
+        return self.get(value) is not None
+
+    def items(self):
+        """
+        The items function lists the children of the Node.
+        :return: iterable of (letter, child) tuples
+        """
+
+        children = self.children
+        if children is None:
+            return ()
+        if children.__class__ is tuple:
+            return (children,)
+        return children.items()
+
+    def child_count(self):
+        children = self.children
+        if children is None:
+            return 0
+        if children.__class__ is tuple:
+            return 1
+        return len(children)
 
     def __str__(self):
         return str(self.value)
 
 
+def node_words(root):
+    """
+    The node_words function walks the Nodes below root depth first and yields the word spelled by every path which
+    ends on a Node marking the end of a word.
+    :param root: the root Node of a Trie or DAWG
+    :return: generator of words
+    """
+
+    stack = [(root, '')]
+    while stack:
+        node, prefix = stack.pop()
+        if node.end:
+            yield prefix
+        for letter, child in node.items():
+            stack.append((child, prefix + letter))
+
+
+def prefixed_words(root, prefix):
+    """
+    The prefixed_words function follows the prefix down from root and yields every word below the Node it reaches.
+    :param root: the root Node of a Trie or DAWG
+    :param prefix: the beginning of the words
+    :return: generator of words
+    """
+
+    node = root
+    for letter in prefix:
+        node = node.get(letter)
+        if node is None:
+            return
+
+    for suffix in node_words(node):
+        yield prefix + suffix
+
+
 class Trie:
     """
     The Trie class initializes an empty Node class as the Trie root. The Trie is then populated with the letters which
@@ -140,23 +655,152 @@ class Trie:
 
     def __init__(self):
         self.root = Node('')
+        self.version = 0
 
-    def add(self, word):
+    def add(self, word, frequency=0):
         """
         The add function takes the empty Node as the root of the Trie then adds letters from the word parameter until
         there are no more letters in the word.
         :param word: A word from the dictionary file
+        :param frequency: how often the word occurs, used to rank completions (see complete())
         """
 
         node = self.root
         for letter in word:
-            next_letter = node[letter]
-            if next_letter is not None:
-                node = next_letter
-            else:
-                node[letter] = Node(letter)
-                node = node[letter]
+            child = node.get(letter)
+            if child is None:
+                child = Node(letter)
+                node[letter] = child
+            node = child
         node.end = True
+        if frequency:
+            node.frequency = frequency
+            self.raise_best(word, frequency)
+        self.version += 1
+
+    def raise_best(self, word, frequency):
+        """
+        The raise_best function raises the highest frequency below each Node on the path of the word to the
+        frequency. Words added without a frequency skip this second walk, which keeps the dictionary build as fast
+        as it was before completions, and set_frequencies() recomputes every highest frequency anyway.
+        :param word: a word of the Trie
+        :param frequency: the frequency of the word
+        """
+
+        node = self.root
+        if frequency > node.best:
+            node.best = frequency
+        for letter in word:
+            node = node.get(letter)
+            if frequency > node.best:
+                node.best = frequency
+
+    def add_many(self, words, frequencies=None):
+        """
+        The add_many function adds every word of a batch to the Trie.
+        :param words: iterable of words to add
+        :param frequencies: optional mapping of words to their frequency, see add()
+        """
+
+        for word in words:
+            self.add(word, frequencies.get(word, 0) if frequencies else 0)
+
+    def set_frequencies(self, frequencies):
+        """
+        The set_frequencies function replaces the frequency of every word in the Trie, then recomputes the highest
+        frequency below each Node in one depth first pass.
+        :param frequencies: mapping of words to their frequency, such as WordFrequencies.counts
+        """
+
+        stack = [(self.root, '', False)]
+        while stack:
+            node, prefix, visited = stack.pop()
+            if visited:
+                best = node.frequency
+                for _, child in node.items():
+                    if child.best > best:
+                        best = child.best
+                node.best = best
+            else:
+                node.frequency = frequencies.get(prefix, 0) if node.end else 0
+                stack.append((node, prefix, True))
+                for letter, child in node.items():
+                    stack.append((child, prefix + letter, False))
+
+    def complete(self, prefix, k=10):
+        """
+        The complete function finds the k most frequent words starting with the prefix. The search is best first:
+        a heap holds Nodes keyed by the highest frequency below them and words keyed by their own frequency, so the
+        first k words popped are the answer and only the Nodes on the way to them are expanded, never whole subtrees.
+        :param prefix: the beginning of the words
+        :param k: number of completions
+        :return: list of (word, frequency) tuples, most frequent first, then alphabetically
+        """
+
+        node = self.root
+        for letter in prefix:
+            node = node[letter]
+            if node is None:
+                return []
+
+        # Words sort before Nodes of the same frequency and spelling, so a word is returned before its extensions
+        heap = [(-node.best, prefix, 1, node)]
+        completions = []
+        while heap and len(completions) < k:
+            priority, word, is_node, node = heapq.heappop(heap)
+            if not is_node:
+                completions.append((word, -priority))
+                continue
+            if node.end:
+                heapq.heappush(heap, (-node.frequency, word, 0, None))
+            for letter, child in node.items():
+                heapq.heappush(heap, (-child.best, word + letter, 1, child))
+
+        return completions
+
+    def remove(self, word):
+        """
+        The remove function clears the end of word flag of the word's last Node, then prunes the Nodes of the word
+        which no longer lead to any other word, from the last letter back up towards the root.
+        :param word: the word to remove from the Trie
+        :return: True if the word was in the Trie, False otherwise
+        """
+
+        path = [self.root]
+        for letter in word:
+            node = path[-1][letter]
+            if node is None:
+                return False
+            path.append(node)
+
+        node = path[-1]
+        if not node.end:
+            return False
+        node.end = False
+        node.frequency = 0
+
+        # path[i] is the parent of path[i + 1], which is reached through word[i]
+        for index in range(len(word) - 1, -1, -1):
+            child = path[index + 1]
+            if child.end or child.children:
+                break
+            del path[index][word[index]]
+
+        # The highest frequencies below the remaining Nodes of the word may have come from the removed word
+        for node in reversed(path):
+            node.best = max([node.frequency] + [child.best for _, child in node.items()])
+
+        self.version += 1
+        return True
+
+    def remove_many(self, words):
+        """
+        The remove_many function removes every word of a batch from the Trie.
+        :param words: iterable of words to remove
+        :return: number of words which were in the Trie and have been removed
+        """
+
+        return sum(self.remove(word) for word in words)
 
     def __contains__(self, word):
         """
@@ -165,105 +809,2885 @@ class Trie:
         :param word: the target word being searched for within the Trie structure
         :return: True or Flase depending on whether or not the word can be found.
         """
+        # One lookup per letter, with the Node children representations unpacked inline
         node = self.root
         for letter in word:
-            if letter not in node:
+            children = node.children
+            if children is None:
                 return False
-            node = node[letter]
+            if children.__class__ is tuple:
+                if children[0] != letter:
+                    return False
+                node = children[1]
+            else:
+                node = children.get(letter)
+                if node is None:
+                    return False
 
-        if node.end:
-            return True
-        return False
+        return node.end
+
+    def __iter__(self):
+        """
+        The __iter__ function yields every word stored in the Trie.
+        :return: generator of words stored in the Trie
+        """
 
+        return node_words(self.root)
 
-class SpellCheck(object):
+    def stats(self):
+        """
+        The stats function walks every Node once and reports the shape of the Trie and its deep size in bytes, as
+        measured by sys.getsizeof(), split between the Node objects, their children (tuples and dicts) and the
+        letter strings. Objects shared between Nodes, such as interned one letter strings, small integers and None,
+        are counted once; the integers are reported as other. Nodes use __slots__, so sys.getsizeof() includes their
+        attributes; 'spellcheck stats' cross-checks the total with tracemalloc.
+        :return: dict of the node and terminal counts, the branching factor histogram (number of children: nodes),
+                 the depth distribution (depth: nodes) and the bytes by kind of object
+        """
+
+        node_count = 0
+        terminal_count = 0
+        branching = Counter()
+        depths = Counter()
+        memory = Counter()
+        seen = set()
+
+        def size(kind, value):
+            if id(value) not in seen:
+                seen.add(id(value))
+                memory[kind] += sys.getsizeof(value)
+
+        stack = [(self.root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            node_count += 1
+            terminal_count += node.end
+            branching[node.child_count()] += 1
+            depths[depth] += 1
+
+            size('nodes', node)
+            size('children', node.children)
+            size('strings', node.value)
+            size('other', node.frequency)
+            size('other', node.best)
+
+            for _, child in node.items():
+                stack.append((child, depth + 1))
+
+        memory['total'] = sum(memory.values())
+
+        return {'nodes': node_count, 'terminals': terminal_count, 'branching': dict(sorted(branching.items())),
+                'depths': dict(sorted(depths.items())), 'bytes': dict(memory)}
+
+    def starts_with(self, prefix):
+        """
+        The starts_with function yields every word stored in the Trie which begins with the prefix.
+        :param prefix: the beginning of the words
+        :return: generator of words, in no particular order
+        """
+
+        return prefixed_words(self.root, prefix)
+
+
+class DoubleArrayTrie:
     """
-    The Spellcheck class adds all dictionary file words into the Trie in order to cross reference the word list against
-    the input file Trie. The __init__ adds the dictionary file's words into its own Trie then checks if the input
-    file's words are in the dictionary Trie. If the input file's words can't be found, they're printed out as
-    incorrect words.
+    The DoubleArrayTrie class stores the same Trie as the Trie class inside two flat integer arrays (BASE and CHECK)
+    instead of one Node object and dict per letter. The child of state s on letter code c lives at index
+    BASE[s] + c, and is only valid when CHECK[BASE[s] + c] == s. Letters are mapped to small integer codes using
+    the alphabet of the stored words, and a third byte array marks the states which complete a word.
+    Words are collected by add() and the arrays are (re)built in one pass on the next lookup, which makes bulk
+    loading a dictionary cheap while keeping the add/__contains__ interface of the Trie class.
     """
 
-    def __init__(self, processed_dictionary):
-        self.processed_dictionary = processed_dictionary
-        self.words = Trie()
-        for word in self.processed_dictionary:
-            self.words.add(word)
+    def __init__(self):
+        self.codes = dict()
+        self.base = array('i', [0])
+        self.check = array('i', [0])
+        self.end = array('b', [0])
+        self.pending = []
+        self.mapping = None
+        self.version = 0
 
-    def spellcheck(self, word):
+    def add(self, word):
         """
-        The spellcheck function determines whether the words in the input Trie are in the dictionary Trie. If the
-        input words aren't found in the dictionary, the words are appended into the incorrect_words list, printed,
-        and then returned as a list.
-        :param word:
-        :return: incorrect_words list
+        The add function queues the word for insertion. The arrays are rebuilt with all queued words the next time
+        the DoubleArrayTrie is searched.
+        :param word: A word from the dictionary file
         """
 
-        incorrect_words = []
+        self.pending.append(word)
+        self.version += 1
 
-        if word not in self.words:
-            incorrect_words.append(word)
-            print(word)
+    def __iter__(self):
+        """
+        The __iter__ function walks the arrays depth first and yields every stored word in sorted order, building
+        the arrays first if words have been added since the last build.
+        :return: generator of words stored in the arrays
+        """
 
-        return incorrect_words
+        if self.pending:
+            self.build()
 
+        letters = {code: letter for letter, code in self.codes.items()}
+        base, check, end = self.base, self.check, self.end
 
-def main():
-    """
-    The main function directs the sequence of operations in this script.
+        # One pass over CHECK recovers the children of every state, in increasing letter code order
+        children = dict()
+        for child in range(1, len(check)):
+            parent = check[child]
+            if parent >= 0:
+                children.setdefault(parent, []).append(child)
 
-    Firstly, the input file and dictionary file are accepted into the ProcessFiles class to be processed,
-    then the outputs are sent over to the SpellCheck class.
+        stack = [(0, '')]
+        while stack:
+            state, prefix = stack.pop()
+            if end[state]:
+                yield prefix
+            offset = base[state]
+            for child in reversed(children.get(state, ())):
+                stack.append((child, prefix + letters[child - offset]))
 
-    The SpellCheck class then calls the spellcheck() function which compares the words in the
-    input file against the words in the dictionary file to determine misspellings.
+    def build(self):
+        """
+        The build function lays out the queued and already stored words into the BASE/CHECK arrays. The words are
+        sorted so that the children of every state are a contiguous run of words, and states are placed breadth
+        first at the lowest base offset whose child slots are all free.
+        """
 
-    :return: all input file words not found in the dictionary file
-    """
+        pending, self.pending = self.pending, []
+        words = sorted(set(pending).union(self))
 
-    command_line_help()
+        codes = {letter: code for code, letter in enumerate(sorted({letter for word in words for letter in word}), 1)}
+        base = [0]
+        check = [0]
+        end = [0]
 
-    if len(sys.argv) <= 2:
-        print('Please input the input files and dictionary files!')
-        sys.exit()
-    elif len(sys.argv) > 3:
-        print('Oops, too many arguments this time!')
-        sys.exit()
-    else:
-        input_processing = ProcessFiles(sys.argv[1])
-        dictionary_processing = ProcessFiles(sys.argv[2])
+        # Free slots are kept in a doubly linked list so the base search never revisits occupied slots. Slots which
+        # keep failing as the first child of a state are dropped from the list to keep the search short.
+        next_free = [-1]
+        previous_free = [-1]
+        failures = [-1]
+        free = {'head': -1, 'tail': -1}
 
-        start_file_check = time.time()
-        print('Checking file format correctness!')
+        def grow(size):
+            for slot in range(len(check), size):
+                base.append(0)
+                check.append(-1)
+                end.append(0)
+                next_free.append(-1)
+                previous_free.append(free['tail'])
+                failures.append(0)
+                if free['tail'] == -1:
+                    free['head'] = slot
+                else:
+                    next_free[free['tail']] = slot
+                free['tail'] = slot
 
-        if dictionary_processing.check_file_format() == 1:
-            end_file_check = time.time()
-            print('Function check_file_format() took: ' + str(end_file_check - start_file_check) + ' seconds\n')
-            print('Checking input words against dictionary!\n')
+        def unlink(slot):
+            failures[slot] = -1
+            before, after = previous_free[slot], next_free[slot]
+            if before == -1:
+                free['head'] = after
+            else:
+                next_free[before] = after
+            if after == -1:
+                free['tail'] = before
+            else:
+                previous_free[after] = before
 
-            processed_input = input_processing.process_input()
+        queue = deque([(0, 0, 0, len(words))])
+        while queue:
+            state, depth, low, high = queue.popleft()
 
-            # Correcting for all digits and ordinal numbers in the input text
-            processed_input = [word for word in processed_input if not re.match(r'\d+', word)]
+            # The sorted order puts the word ending at this state ahead of its completions
+            if low < high and len(words[low]) == depth:
+                end[state] = 1
+                low += 1
+            if low == high:
+                continue
 
-            processed_dictionary = dictionary_processing.process_input()
+            groups = []
+            start = low
+            while start < high:
+                letter = words[start][depth]
+                stop = start + 1
+                while stop < high and words[stop][depth] == letter:
+                    stop += 1
+                groups.append((codes[letter], start, stop))
+                start = stop
 
-            spell_check_start_time = time.time()
-            check_spelling = SpellCheck(processed_dictionary)
+            first_code, last_code = groups[0][0], groups[-1][0]
+            slot = free['head']
+            while True:
+                if slot == -1:
+                    slot = len(check)
+                    grow(slot + last_code + 1)
+                offset = slot - first_code
+                if offset >= 1:
+                    if offset + last_code >= len(check):
+                        grow(offset + last_code + 1)
+                    if all(check[offset + code] < 0 for code, _, _ in groups):
+                        break
+                following = next_free[slot]
+                failures[slot] += 1
+                if failures[slot] > 16:
+                    unlink(slot)
+                slot = following
 
-            for word in processed_input:
-                check_spelling.spellcheck(word)
+            base[state] = offset
+            for code, start, stop in groups:
+                check[offset + code] = state
+                if failures[offset + code] >= 0:
+                    unlink(offset + code)
+                queue.append((offset + code, depth + 1, start, stop))
 
-            spell_check_end_time = time.time()
-            print('Function spellcheck() took: ' + str(spell_check_end_time - spell_check_start_time) + ' seconds')
+        base, check, end = array('i', base), array('i', check), array('b', end)
+        self.codes, self.base, self.check, self.end = codes, base, check, end
 
-            sys.exit()
+    def finish(self):
+        """
+        The finish function builds the arrays if words have been added since the last build.
+        """
 
-        else:
-            end_file_check = time.time()
-            print('File format checking took: ' + str(end_file_check - start_file_check) + ' seconds')
-            print('The dictionary file hasn\'t been formatted properly, please format your file correctly!')
-            sys.exit()
+        if self.pending:
+            self.build()
+
+    def __contains__(self, word):
+        """
+        The __contains__ function follows BASE/CHECK transitions for each letter of the word, building the arrays
+        first if words have been added since the last search.
+        :param word: the target word being searched for within the DoubleArrayTrie
+        :return: True or False depending on whether or not the word can be found.
+        """
+
+        if self.pending:
+            self.build()
+
+        codes, base, check = self.codes, self.base, self.check
+        size = len(check)
+        state = 0
+        for letter in word:
+            code = codes.get(letter)
+            if code is None:
+                return False
+            child = base[state] + code
+            if child >= size or check[child] != state:
+                return False
+            state = child
+
+        return bool(self.end[state])
+
+    def save(self, index_file, source_checksum=0):
+        """
+        The save function writes the arrays into a flat binary index file: a fixed header (magic, format version,
+        byte order, word count, source checksum, alphabet length and array length), the alphabet in code order,
+        then the raw BASE, CHECK and end arrays. The file can be memory-mapped and searched without any parsing.
+        :param index_file: path of the index file to write
+        :param source_checksum: checksum of the dictionary file the index was built from
+        """
+
+        if self.pending:
+            self.build()
+
+        alphabet = ''.join(sorted(self.codes, key=self.codes.get)).encode('utf-8')
+        alphabet += b'\0' * (-len(alphabet) % 4)
+        header = INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, INDEX_BYTE_ORDER, sum(self.end), source_checksum,
+                                   len(alphabet), len(self.check))
+
+        # Writing next to the index and renaming keeps processes which have the old index mapped safe
+        with open(index_file + '.tmp', 'wb') as file:
+            file.write(header)
+            file.write(alphabet)
+            file.write(array('i', self.base).tobytes())
+            file.write(array('i', self.check).tobytes())
+            file.write(array('b', self.end).tobytes())
+        os.replace(index_file + '.tmp', index_file)
+
+    @classmethod
+    def load(cls, index_file):
+        """
+        The load function memory-maps an index file written by save() and searches it in place. The BASE, CHECK
+        and end arrays are memoryviews over the mapping, so only the pages touched by lookups are ever read.
+        :param index_file: path of the index file to map
+        :return: DoubleArrayTrie backed by the index file, with word_count and source_checksum from its header
+        """
+
+        with open(index_file, 'rb') as file:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(mapping) < INDEX_HEADER.size:
+            raise ValueError('The index file is too short to be a dictionary index: ' + index_file)
+
+        magic, version, byte_order, word_count, source_checksum, alphabet_length, size = \
+            INDEX_HEADER.unpack_from(mapping)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION or byte_order != INDEX_BYTE_ORDER:
+            raise ValueError('The index file has an unsupported format: ' + index_file)
+
+        offset = INDEX_HEADER.size
+        alphabet = mapping[offset:offset + alphabet_length].rstrip(b'\0').decode('utf-8')
+        offset += alphabet_length
+        if len(mapping) != offset + 9 * size:
+            raise ValueError('The index file is truncated: ' + index_file)
+
+        view = memoryview(mapping)
+        trie = cls()
+        trie.codes = {letter: code for code, letter in enumerate(alphabet, 1)}
+        trie.base = view[offset:offset + 4 * size].cast('i')
+        trie.check = view[offset + 4 * size:offset + 8 * size].cast('i')
+        trie.end = view[offset + 8 * size:offset + 9 * size].cast('b')
+        trie.mapping = mapping
+        trie.index_file = index_file
+        trie.word_count = word_count
+        trie.source_checksum = source_checksum
+
+        return trie
+
+    def __getstate__(self):
+        # A memory-mapped DoubleArrayTrie is pickled as the path of its index file and mapped again when unpickled
+        if self.mapping is not None:
+            return {'index_file': self.index_file}
+        return self.__dict__
+
+    def __setstate__(self, state):
+        if 'index_file' in state:
+            state = DoubleArrayTrie.load(state['index_file']).__dict__
+        self.__dict__.update(state)
+
+
+class DAWG:
+    """
+    The DAWG class builds a minimal acyclic automaton (directed acyclic word graph) using Daciuk's incremental
+    algorithm. Words have to be added in sorted order; each time a new word diverges from the previous one, the
+    finished suffix of the previous word is minimized by replacing every state with an equivalent state from the
+    register (same end flag and same outgoing letters and targets). Prefixes and suffixes are therefore both shared,
+    so endings such as 'ing', 'ed' and "'s" are stored once. The DAWG becomes read-only on its first search.
+    """
+
+    sorted_input = True
+
+    def __init__(self):
+        self.root = Node('')
+        self.register = dict()
+        self.unchecked = []
+        self.previous_word = ''
+        self.finished = False
+        self.trie_node_count = 1
+        self.trie_edge_count = 0
+        self.version = 0
+
+    def add(self, word):
+        """
+        The add function inserts the suffix of the word which isn't shared with the previously added word, after
+        minimizing the part of the previous word which can no longer change.
+        :param word: A word from the dictionary file, not sorting before the previously added word
+        """
+
+        if self.finished:
+            raise ValueError('The DAWG is read-only once it has been searched')
+        if word < self.previous_word:
+            raise ValueError('Words must be added to the DAWG in sorted order: ' + repr(word))
+
+        common_prefix = 0
+        for letter, previous_letter in zip(word, self.previous_word):
+            if letter != previous_letter:
+                break
+            common_prefix += 1
+
+        self.minimize(common_prefix)
+
+        node = self.unchecked[-1][2] if self.unchecked else self.root
+        for letter in word[common_prefix:]:
+            child = Node(letter)
+            node[letter] = child
+            self.unchecked.append((node, letter, child))
+            node = child
+            self.trie_node_count += 1
+            self.trie_edge_count += 1
+        node.end = True
+        self.previous_word = word
+        self.version += 1
+
+    def minimize(self, down_to):
+        """
+        The minimize function walks the unchecked path of the previous word back up to the given depth, merging each
+        state into an equivalent registered state or registering it as a new one.
+        :param down_to: the length of the prefix which is still shared with the next word
+        """
+
+        register = self.register
+        while len(self.unchecked) > down_to:
+            parent, letter, child = self.unchecked.pop()
+            key = (child.end, tuple((next_letter, id(next_node)) for next_letter, next_node in child.items()))
+            if key in register:
+                parent[letter] = register[key]
+            else:
+                register[key] = child
+
+    def finish(self):
+        """
+        The finish function minimizes the remaining path of the last added word and makes the DAWG read-only.
+        """
+
+        self.minimize(0)
+        self.finished = True
+
+    @property
+    def node_count(self):
+        return len(self.register) + 1
+
+    @property
+    def edge_count(self):
+        return self.root.child_count() + sum(node.child_count() for node in self.register.values())
+
+    def report(self):
+        """
+        The report function describes how many nodes and edges minimization saved compared to the equivalent Trie.
+        :return: report string of node and edge counts before and after minimization
+        """
+
+        if not self.finished:
+            self.finish()
+
+        return ('DAWG minimization: {} nodes / {} edges in the Trie, {} nodes / {} edges after minimization'
+                .format(self.trie_node_count, self.trie_edge_count, self.node_count, self.edge_count))
+
+    def __contains__(self, word):
+        """
+        The __contains__ function follows the DAWG transitions for each letter of the word, exactly like the Trie.
+        :param word: the target word being searched for within the DAWG
+        :return: True or False depending on whether or not the word can be found.
+        """
+
+        if not self.finished:
+            self.finish()
+
+        node = self.root
+        for letter in word:
+            node = node.get(letter)
+            if node is None:
+                return False
+
+        return node.end
+
+    def __iter__(self):
+        """
+        The __iter__ function yields every word accepted by the DAWG.
+        :return: generator of words stored in the DAWG
+        """
+
+        if not self.finished:
+            self.finish()
+
+        return node_words(self.root)
+
+    def starts_with(self, prefix):
+        """
+        The starts_with function yields every word accepted by the DAWG which begins with the prefix.
+        :param prefix: the beginning of the words
+        :return: generator of words, in no particular order
+        """
+
+        if not self.finished:
+            self.finish()
+
+        return prefixed_words(self.root, prefix)
+
+
+class WordSet:
+    """
+    The WordSet class stores the dictionary as a plain frozenset: one hash lookup per search, no prefix structure.
+    Added words are queued and the frozenset is rebuilt with them on the next search.
+    """
+
+    def __init__(self):
+        self.words = frozenset()
+        self.pending = []
+        self.version = 0
+
+    def add(self, word):
+        self.pending.append(word)
+        self.version += 1
+
+    def finish(self):
+        """
+        The finish function freezes the words added since the last search into the set.
+        """
+
+        if self.pending:
+            self.words = self.words.union(self.pending)
+            self.pending = []
+
+    def __contains__(self, word):
+        if self.pending:
+            self.finish()
+
+        return word in self.words
+
+    def __iter__(self):
+        self.finish()
+
+        return iter(self.words)
+
+
+class SortedWordArray:
+    """
+    The SortedWordArray class stores the dictionary as a sorted list of words searched with bisect, which costs
+    O(log n) string comparisons per search but supports prefix searches as one contiguous range of the list.
+    Added words are queued and merged into the list on the next search.
+    """
+
+    def __init__(self):
+        self.words = []
+        self.pending = []
+        self.version = 0
+
+    def add(self, word):
+        self.pending.append(word)
+        self.version += 1
+
+    def finish(self):
+        """
+        The finish function sorts the words added since the last search into the list.
+        """
+
+        if self.pending:
+            self.words = sorted(set(self.words).union(self.pending))
+            self.pending = []
+
+    def __contains__(self, word):
+        if self.pending:
+            self.finish()
+
+        words = self.words
+        position = bisect.bisect_left(words, word)
+        return position < len(words) and words[position] == word
+
+    def __iter__(self):
+        self.finish()
+
+        return iter(self.words)
+
+    def starts_with(self, prefix):
+        """
+        The starts_with function yields every word of the list which begins with the prefix.
+        :param prefix: the beginning of the words
+        :return: generator of words, in sorted order
+        """
+
+        self.finish()
+
+        words = self.words
+        position = bisect.bisect_left(words, prefix)
+        while position < len(words) and words[position].startswith(prefix):
+            yield words[position]
+            position += 1
+
+
+class TernarySearchTree:
+    """
+    The TernarySearchTree class stores one letter per node, with a low and a high child for smaller and larger
+    letters at the same position and an equal child for the next letter, so a node costs three links instead of a
+    dict of children. The nodes live in parallel arrays indexed by node number, -1 meaning no child. Added words are
+    queued and inserted on the next search, middle word first, which keeps the low/high links balanced.
+    """
+
+    def __init__(self):
+        self.letters = []
+        self.low = array('i')
+        self.equal = array('i')
+        self.high = array('i')
+        self.end = bytearray()
+        self.root = -1
+        self.empty_word = False
+        self.pending = []
+        self.version = 0
+
+    def add(self, word):
+        self.pending.append(word)
+        self.version += 1
+
+    def finish(self):
+        """
+        The finish function inserts the words added since the last search, in balanced order: the middle word of
+        the sorted words first, then the middle words of each half, and so on.
+        """
+
+        if not self.pending:
+            return
+
+        words = sorted(set(self.pending))
+        self.pending = []
+        ranges = deque([(0, len(words))])
+        while ranges:
+            start, stop = ranges.popleft()
+            if start < stop:
+                middle = (start + stop) // 2
+                self.insert(words[middle])
+                ranges.append((start, middle))
+                ranges.append((middle + 1, stop))
+
+    def new_node(self, letter):
+        self.letters.append(letter)
+        self.low.append(-1)
+        self.equal.append(-1)
+        self.high.append(-1)
+        self.end.append(0)
+        return len(self.letters) - 1
+
+    def insert(self, word):
+        """
+        The insert function adds one word to the tree.
+        :param word: A word from the dictionary file
+        """
+
+        if not word:
+            self.empty_word = True
+            return
+
+        if self.root == -1:
+            self.root = self.new_node(word[0])
+
+        node, index = self.root, 0
+        while True:
+            letter, node_letter = word[index], self.letters[node]
+            if letter < node_letter:
+                links = self.low
+            elif letter > node_letter:
+                links = self.high
+            else:
+                index += 1
+                if index == len(word):
+                    self.end[node] = 1
+                    return
+                letter, links = word[index], self.equal
+
+            if links[node] == -1:
+                links[node] = self.new_node(letter)
+            node = links[node]
+
+    def find(self, word):
+        """
+        The find function follows the tree to the node of the last letter of the word.
+        :param word: a non-empty word
+        :return: the node number, or -1 when no stored word begins with the word
+        """
+
+        letters, low, equal, high = self.letters, self.low, self.equal, self.high
+        node, index, last = self.root, 0, len(word) - 1
+        while node != -1:
+            letter, node_letter = word[index], letters[node]
+            if letter < node_letter:
+                node = low[node]
+            elif letter > node_letter:
+                node = high[node]
+            elif index == last:
+                return node
+            else:
+                index += 1
+                node = equal[node]
+
+        return -1
+
+    def __contains__(self, word):
+        if self.pending:
+            self.finish()
+
+        if not word:
+            return self.empty_word
+
+        node = self.find(word)
+        return node != -1 and self.end[node] == 1
+
+    def subtree_words(self, node, prefix):
+        """
+        The subtree_words function yields the words stored below a node in sorted order.
+        :param node: the node number
+        :param prefix: the letters spelled by the equal links leading to the node
+        :return: generator of words
+        """
+
+        if node == -1:
+            return
+
+        yield from self.subtree_words(self.low[node], prefix)
+        word = prefix + self.letters[node]
+        if self.end[node]:
+            yield word
+        yield from self.subtree_words(self.equal[node], word)
+        yield from self.subtree_words(self.high[node], prefix)
+
+    def __iter__(self):
+        self.finish()
+
+        if self.empty_word:
+            yield ''
+        yield from self.subtree_words(self.root, '')
+
+    def starts_with(self, prefix):
+        """
+        The starts_with function yields every word stored in the tree which begins with the prefix.
+        :param prefix: the beginning of the words
+        :return: generator of words, in sorted order
+        """
+
+        if not prefix:
+            yield from self
+            return
+
+        self.finish()
+
+        node = self.find(prefix)
+        if node == -1:
+            return
+        if self.end[node]:
+            yield prefix
+        yield from self.subtree_words(self.equal[node], prefix)
+
+
+class RadixNode:
+    """
+    The RadixNode class is a node of the RadixTrie: the label of the edge leading to it, which may be several
+    letters long, its children keyed by the first letter of their label, and whether a word ends on it.
+    """
+
+    __slots__ = ('label', 'children', 'end')
+
+    def __init__(self, label, end=False):
+        self.label = label
+        self.children = None
+        self.end = end
+
+
+class RadixTrie:
+    """
+    The RadixTrie class is a Patricia trie: chains of single child Nodes are collapsed into one edge labelled with
+    their letters, so a word costs one dict hop and one string comparison per branching point instead of one Node
+    per letter. Edges are matched with str.startswith() at the current offset, which compares the label in place
+    like a slice comparison without copying the slice. Adding a word which diverges inside an edge splits it.
+    """
+
+    def __init__(self):
+        self.root = RadixNode('')
+        self.version = 0
+
+    def add(self, word):
+        """
+        The add function follows the edges matching the word, splits the edge where the word diverges, and hangs the
+        rest of the word as one new leaf edge.
+        :param word: A word from the dictionary file
+        """
+
+        node, offset, length = self.root, 0, len(word)
+        while offset < length:
+            children = node.children
+            child = children.get(word[offset]) if children is not None else None
+            if child is None:
+                if children is None:
+                    node.children = children = dict()
+                children[word[offset]] = RadixNode(word[offset:], True)
+                self.version += 1
+                return
+
+            label = child.label
+            if word.startswith(label, offset):
+                node, offset = child, offset + len(label)
+                continue
+
+            shared = 1
+            while offset + shared < length and label[shared] == word[offset + shared]:
+                shared += 1
+            middle = RadixNode(label[:shared])
+            child.label = label[shared:]
+            middle.children = {child.label[0]: child}
+            children[word[offset]] = middle
+            node, offset = middle, offset + shared
+
+        node.end = True
+        self.version += 1
+
+    def __contains__(self, word):
+        """
+        The __contains__ function follows the edges whose labels match the word at the current offset.
+        :param word: the target word being searched for within the RadixTrie
+        :return: True or False depending on whether or not the word can be found.
+        """
+
+        node, offset, length = self.root, 0, len(word)
+        while offset < length:
+            children = node.children
+            if children is None:
+                return False
+            node = children.get(word[offset])
+            if node is None or not word.startswith(node.label, offset):
+                return False
+            offset += len(node.label)
+
+        return node.end
+
+    def words_below(self, node, prefix):
+        """
+        The words_below function walks the edges below a node depth first and yields every word ending below it.
+        :param node: the RadixNode
+        :param prefix: the letters of the edges leading to the node
+        :return: generator of words
+        """
+
+        stack = [(node, prefix)]
+        while stack:
+            node, prefix = stack.pop()
+            if node.end:
+                yield prefix
+            if node.children is not None:
+                for child in node.children.values():
+                    stack.append((child, prefix + child.label))
+
+    def __iter__(self):
+        return self.words_below(self.root, '')
+
+    def starts_with(self, prefix):
+        """
+        The starts_with function yields every word stored in the RadixTrie which begins with the prefix. The prefix
+        may end in the middle of an edge, in which case the words below that edge all match.
+        :param prefix: the beginning of the words
+        :return: generator of words, in no particular order
+        """
+
+        node, offset, length = self.root, 0, len(prefix)
+        while offset < length:
+            children = node.children
+            node = children.get(prefix[offset]) if children is not None else None
+            if node is None:
+                return iter(())
+            label = node.label
+            if prefix.startswith(label, offset):
+                offset += len(label)
+            elif label.startswith(prefix[offset:]):
+                return self.words_below(node, prefix[:offset] + label)
+            else:
+                return iter(())
+
+        return self.words_below(node, prefix)
+
+    def stats(self):
+        """
+        The stats function counts the nodes and measures the deep size of the RadixTrie with sys.getsizeof(), split
+        between the nodes, their children dicts and the edge labels, as in Trie.stats().
+        :return: dict of the node and terminal counts and the bytes by kind of object
+        """
+
+        node_count = 0
+        terminal_count = 0
+        memory = Counter()
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            node_count += 1
+            terminal_count += node.end
+            memory['nodes'] += sys.getsizeof(node)
+            memory['strings'] += sys.getsizeof(node.label)
+            if node.children is not None:
+                memory['children'] += sys.getsizeof(node.children)
+                stack.extend(node.children.values())
+        memory['total'] = sum(memory.values())
+
+        return {'nodes': node_count, 'terminals': terminal_count, 'bytes': dict(memory)}
+
+
+TRIE_BACKENDS = {
+    'trie': Trie,
+    'double-array': DoubleArrayTrie,
+    'dawg': DAWG,
+    'set': WordSet,
+    'sorted-array': SortedWordArray,
+    'ternary': TernarySearchTree,
+    'radix': RadixTrie,
+}
+
+# Measured with 'spellcheck backends american-english': memory per word and mean of the hit and miss lookup time
+BACKEND_PROFILES = {
+    'trie': {'bytes_per_word': 308, 'lookup_ns': 6000, 'prefix': True, 'fuzzy': True},
+    'double-array': {'bytes_per_word': 23, 'lookup_ns': 4600, 'prefix': False, 'fuzzy': False},
+    'dawg': {'bytes_per_word': 221, 'lookup_ns': 5400, 'prefix': True, 'fuzzy': True},
+    'set': {'bytes_per_word': 86, 'lookup_ns': 580, 'prefix': False, 'fuzzy': False},
+    'sorted-array': {'bytes_per_word': 65, 'lookup_ns': 3300, 'prefix': True, 'fuzzy': False},
+    'ternary': {'bytes_per_word': 53, 'lookup_ns': 11200, 'prefix': True, 'fuzzy': False},
+    'radix': {'bytes_per_word': 199, 'lookup_ns': 9000, 'prefix': True, 'fuzzy': False},
+}
+
+
+def select_backend(word_count, memory_budget=None, prefix=False, fuzzy=False, profiles=None):
+    """
+    The select_backend function picks the dictionary backend for a dictionary: among the backends supporting the
+    queries needed, the fastest one whose estimated memory fits the budget, or the smallest one when none fits.
+    Prefix searches need a starts_with method, and fuzzy searches ('trie' and 'automaton' suggestions) need Nodes.
+    :param word_count: number of dictionary words
+    :param memory_budget: bytes the backend may use, unlimited when None
+    :param prefix: whether prefix searches are needed
+    :param fuzzy: whether Trie suggestions are needed
+    :param profiles: backend profiles as in BACKEND_PROFILES, which is used when omitted
+    :return: name of the backend in TRIE_BACKENDS
+    """
+
+    profiles = BACKEND_PROFILES if profiles is None else profiles
+    candidates = [name for name, profile in profiles.items()
+                  if (profile['prefix'] or not prefix) and (profile['fuzzy'] or not fuzzy)]
+    if not candidates:
+        raise ValueError('No dictionary backend supports the queries needed')
+
+    fitting = [name for name in candidates
+               if memory_budget is None or profiles[name]['bytes_per_word'] * word_count <= memory_budget]
+    if fitting:
+        return min(fitting, key=lambda name: profiles[name]['lookup_ns'])
+
+    return min(candidates, key=lambda name: profiles[name]['bytes_per_word'])
+
+
+def damerau_levenshtein(source, target):
+    """
+    The damerau_levenshtein function follows the Wikipedia pseudocode for the Damerau-Levenshtein distance with
+    adjacent transpositions (the unrestricted variant, where substrings may be edited again after transposing).
+    Entries with 0 distance are the same word.
+    :param source: first word
+    :param target: second word
+    :return: minimum number of insertions, deletions, substitutions and transpositions turning source into target
+    """
+
+    max_distance = len(source) + len(target)
+    last_row = dict()
+    rows = [[max_distance] * (len(target) + 2)]
+    rows.append([max_distance] + list(range(len(target) + 1)))
+    columns = range(1, len(target) + 1)
+
+    for i in range(1, len(source) + 1):
+        previous = rows[i]
+        row = [max_distance, i]
+        letter = source[i - 1]
+        last_column = 0
+        for j in columns:
+            target_letter = target[j - 1]
+            k = last_row.get(target_letter, 0)
+            l = last_column
+            if letter == target_letter:
+                distance = previous[j]
+                last_column = j
+            else:
+                distance = previous[j] + 1
+            if row[j] + 1 < distance:
+                distance = row[j] + 1
+            if previous[j + 1] + 1 < distance:
+                distance = previous[j + 1] + 1
+            if k and l:
+                transposition = rows[k][l] + (i - k - 1) + 1 + (j - l - 1)
+                if transposition < distance:
+                    distance = transposition
+            row.append(distance)
+        rows.append(row)
+        last_row[letter] = i
+
+    return rows[-1][-1]
+
+
+class SymmetricDeleteIndex:
+    """
+    The SymmetricDeleteIndex class precomputes, for every dictionary word, all the strings obtained by deleting up
+    to max_distance letters (SymSpell's symmetric delete method) and maps each of them to its source words. Two words
+    within max_distance edits always share such a delete, so a lookup only generates the deletes of the query and
+    probes the map, then verifies the few candidates with the exact Damerau-Levenshtein distance. As in SymSpell,
+    only the first prefix_length letters of each word are indexed, which bounds the number of deletes per word.
+    """
+
+    def __init__(self, words, max_distance=2, prefix_length=7):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.deletes = dict()
+        self.word_count = 0
+
+        deletes = self.deletes
+        for word in words:
+            self.word_count += 1
+            for delete in self.edits(word):
+                sources = deletes.get(delete)
+                if sources is None:
+                    deletes[delete] = [word]
+                else:
+                    sources.append(word)
+
+    def edits(self, word, max_distance=None):
+        """
+        The edits function generates the word's prefix and every distinct string reached from it by deleting up to
+        max_distance letters.
+        :param word: the word to delete letters from
+        :param max_distance: largest number of deleted letters, the index's max_distance by default
+        :return: set of deletes including the unchanged prefix
+        """
+
+        if max_distance is None:
+            max_distance = self.max_distance
+
+        edits = {word[:self.prefix_length]}
+        frontier = edits
+        for _ in range(max_distance):
+            frontier = {edit[:position] + edit[position + 1:] for edit in frontier for position in range(len(edit))}
+            edits |= frontier
+
+        return edits
+
+    def lookup(self, word, max_distance=None):
+        """
+        The lookup function finds the dictionary words within max_distance Damerau-Levenshtein edits of the word.
+        :param word: the misspelled word
+        :param max_distance: largest edit distance of the suggestions, at most the index's max_distance
+        :return: list of (suggestion, distance) tuples, closest first, then alphabetically
+        """
+
+        if max_distance is None:
+            max_distance = self.max_distance
+        elif max_distance > self.max_distance:
+            raise ValueError('The index was built for distances up to ' + str(self.max_distance))
+
+        deletes = self.deletes
+        candidates = set()
+        for delete in self.edits(word, max_distance):
+            candidates.update(deletes.get(delete, ()))
+
+        suggestions = []
+        for candidate in candidates:
+            if abs(len(candidate) - len(word)) <= max_distance:
+                distance = damerau_levenshtein(word, candidate)
+                if distance <= max_distance:
+                    suggestions.append((candidate, distance))
+        suggestions.sort(key=lambda suggestion: (suggestion[1], suggestion[0]))
+
+        return suggestions
+
+    def size(self):
+        """
+        The size function estimates the memory used by the index: the delete map, its delete strings and the source
+        lists. The dictionary words themselves are shared with the dictionary and aren't counted.
+        :return: size of the index in bytes
+        """
+
+        return sys.getsizeof(self.deletes) + sum(sys.getsizeof(delete) + sys.getsizeof(sources)
+                                                 for delete, sources in self.deletes.items())
+
+
+class WordFrequencies:
+    """
+    The WordFrequencies class holds the number of times each word occurs in a corpus, which gives the probability
+    P(word) used to rank corrections as in Norvig's spelling corrector. Counts are learned by streaming the corpus
+    through ProcessFiles.tokens() and persisted as a gzip compressed counts file, whose first line records the
+    format version and the checksum of the corpus it was learned from.
+    """
+
+    def __init__(self, counts=None, source_checksum=0):
+        self.counts = Counter() if counts is None else Counter(counts)
+        self.total = sum(self.counts.values())
+        self.source_checksum = source_checksum
+
+    @classmethod
+    def train(cls, corpus_file):
+        """
+        The train function counts the words of a corpus file.
+        :param corpus_file: path of the corpus file, such as 2600.txt
+        :return: WordFrequencies learned from the corpus
+        """
+
+        return cls(Counter(ProcessFiles(corpus_file).tokens()), file_checksum(corpus_file))
+
+    def save(self, counts_file):
+        """
+        The save function writes the counts, most frequent first, as one 'word count' line each.
+        :param counts_file: path of the counts file to write
+        """
+
+        with gzip.open(counts_file + '.tmp', 'wt', encoding='utf-8') as file:
+            file.write('{} {} {}\n'.format(COUNTS_MAGIC, COUNTS_VERSION, self.source_checksum))
+            for word, count in self.counts.most_common():
+                file.write('{} {}\n'.format(word, count))
+        os.replace(counts_file + '.tmp', counts_file)
+
+    @classmethod
+    def load(cls, counts_file):
+        """
+        The load function reads a counts file written by save().
+        :param counts_file: path of the counts file
+        :return: WordFrequencies with the source_checksum from the counts file header
+        """
+
+        with gzip.open(counts_file, 'rt', encoding='utf-8') as file:
+            header = file.readline().split()
+            if len(header) != 3 or header[0] != COUNTS_MAGIC or header[1] != str(COUNTS_VERSION):
+                raise ValueError('The counts file has an unsupported format: ' + counts_file)
+
+            counts = dict()
+            for line in file:
+                word, count = line.split()
+                counts[word] = int(count)
+
+        return cls(counts, int(header[2]))
+
+    def probability(self, word):
+        """
+        The probability function estimates P(word) as its share of all the counted words.
+        :param word: the word
+        :return: probability of the word, 0 for words which never occurred
+        """
+
+        return self.counts[word] / self.total if self.total else 0
+
+
+def load_frequencies(corpus_file, counts_file=None):
+    """
+    The load_frequencies function reads the counts file learned from the current contents of the corpus file, or
+    learns the counts from the corpus and saves them when the counts file is missing, unreadable or stale.
+    :param corpus_file: path of the corpus file
+    :param counts_file: path of the counts file, the corpus file name with a '.counts' suffix by default
+    :return: WordFrequencies of the corpus
+    """
+
+    if counts_file is None:
+        counts_file = corpus_file + '.counts'
+
+    try:
+        frequencies = WordFrequencies.load(counts_file)
+    except (OSError, ValueError, EOFError):
+        frequencies = None
+
+    if frequencies is None or frequencies.source_checksum != file_checksum(corpus_file):
+        frequencies = WordFrequencies.train(corpus_file)
+        frequencies.save(counts_file)
+
+    return frequencies
+
+
+class LRUCache:
+    """
+    The LRUCache class keeps the results of the most recently used suggestion and correction lookups, up to a fixed
+    capacity. Looking up or storing a key moves it to the end of an OrderedDict, so the least recently used entry
+    is always first and is evicted once the capacity is exceeded. A capacity of 0 disables caching.
+    Hits, misses and evictions are counted so the hit rate on real text can be measured.
+    """
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        The get function returns the cached value of the key and marks it as most recently used.
+        :param key: the lookup key
+        :return: the cached value, or None when the key isn't cached
+        """
+
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+
+        return value
+
+    def put(self, key, value):
+        """
+        The put function caches the value of the key, evicting the least recently used entry when the cache is full.
+        :param key: the lookup key
+        :param value: the value to cache
+        """
+
+        if self.capacity <= 0:
+            return
+
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        """
+        The stats function reports the cache counters.
+        :return: dict of the capacity, size, hits, misses, evictions and hit rate
+        """
+
+        lookups = self.hits + self.misses
+        return {'capacity': self.capacity, 'size': len(self.entries), 'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'hit_rate': self.hits / lookups if lookups else 0.0}
+
+
+class BloomFilter:
+    """
+    The BloomFilter class answers approximate membership with a blocked Bloom filter: a single hash of the word
+    picks one 64-bit block and one of BLOOM_PATTERNS precomputed bit patterns, and the word is present only if every
+    bit of its pattern is set in its block. A lookup is one hash (cached on Python strings) and one word sized
+    probe instead of one probe per hash function. It has no false negatives, and its false positive rate is set by
+    the number of bits per word. Blocking needs more bits than a classic Bloom filter for the same rate, especially
+    below 1%, so stats() reports the rate expected from the blocks as they were actually filled.
+    Python string hashes are randomized per process, so the filter must be rebuilt rather than pickled.
+    """
+
+    def __init__(self, capacity, false_positive_rate=0.01):
+        if not 0 < false_positive_rate < 1:
+            raise ValueError('The false positive rate must be between 0 and 1, not {}'.format(false_positive_rate))
+
+        capacity = max(1, capacity)
+        bits_per_word = -math.log(false_positive_rate) / math.log(2) ** 2
+        self.hash_count = min(16, max(1, round(bits_per_word * math.log(2))))
+        self.block_count = max(1, int(capacity * bits_per_word * 1.3) // 64)
+        self.blocks = array('Q', bytes(8 * self.block_count))
+        generator = random.Random(0)
+        self.patterns = array('Q', [sum(1 << bit for bit in generator.sample(range(64), self.hash_count))
+                                    for _ in range(BLOOM_PATTERNS)])
+        self.count = 0
+
+    def add(self, word):
+        hashed = hash(word)
+        self.blocks[(hashed >> BLOOM_PATTERN_BITS) % self.block_count] |= self.patterns[hashed & (BLOOM_PATTERNS - 1)]
+        self.count += 1
+
+    def __contains__(self, word):
+        hashed = hash(word)
+        pattern = self.patterns[hashed & (BLOOM_PATTERNS - 1)]
+        return self.blocks[(hashed >> BLOOM_PATTERN_BITS) % self.block_count] & pattern == pattern
+
+    def false_positive_rate(self):
+        """
+        The false_positive_rate function estimates the false positive rate from the share of bits which are set in
+        each block, since a word which was never added is a false positive when its block has all its pattern bits.
+        :return: expected probability that a word which was never added is reported as present
+        """
+
+        hash_count = self.hash_count
+        return sum((bin(block).count('1') / 64) ** hash_count for block in self.blocks) / self.block_count
+
+    def stats(self):
+        """
+        The stats function reports the size of the filter.
+        :return: dict of the number of bits, bits per pattern and words, the memory in bytes and the expected false
+                 positive rate
+        """
+
+        return {'bits': 64 * self.block_count, 'hashes': self.hash_count, 'words': self.count,
+                'bytes': self.blocks.itemsize * len(self.blocks) + self.patterns.itemsize * len(self.patterns),
+                'expected_false_positive_rate': self.false_positive_rate()}
+
+
+class BKTree:
+    """
+    The BKTree class indexes the dictionary words in a Burkhard-Keller tree under the Damerau-Levenshtein distance,
+    which is a metric. Every child of a node hangs under its distance to the node's word, so by the triangle
+    inequality a radius query only needs to descend into children whose distance is within max_distance of the
+    query's distance to the node. Nodes are [word, {distance: child}, insertion index] lists. The tree can be saved
+    once and loaded later without computing any distance, as one 'word parent distance' line per node in insertion
+    order.
+    """
+
+    def __init__(self, words=()):
+        self.root = None
+        self.nodes = []
+        self.distance_count = 0
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        """
+        The add function descends from the root along the children at the word's distance to each node and hangs the
+        word under the first node which has no child at that distance.
+        :param word: A word from the dictionary file
+        """
+
+        node = [word, dict(), len(self.nodes)]
+        if self.root is None:
+            self.root = node
+            self.nodes.append((word, -1, 0))
+            return
+
+        parent = self.root
+        parent_index = 0
+        while True:
+            distance = damerau_levenshtein(word, parent[0])
+            if distance == 0:
+                return
+            child = parent[1].get(distance)
+            if child is None:
+                parent[1][distance] = node
+                self.nodes.append((word, parent_index, distance))
+                return
+            parent = child
+            parent_index = child[2]
+
+    def search(self, word, max_distance=2):
+        """
+        The search function finds the dictionary words within max_distance of the word. The number of distances
+        computed by the last search is kept in distance_count.
+        :param word: the misspelled word
+        :param max_distance: largest edit distance of the suggestions
+        :return: list of (suggestion, distance) tuples, closest first, then alphabetically
+        """
+
+        suggestions = []
+        self.distance_count = 0
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = damerau_levenshtein(word, node[0])
+            self.distance_count += 1
+            if distance <= max_distance:
+                suggestions.append((node[0], distance))
+            for child_distance, child in node[1].items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        suggestions.sort(key=lambda suggestion: (suggestion[1], suggestion[0]))
+
+        return suggestions
+
+    def save(self, tree_file, source_checksum=0):
+        """
+        The save function writes the tree as a gzip compressed file of 'word parent distance' lines.
+        :param tree_file: path of the tree file to write
+        :param source_checksum: checksum of the dictionary file the tree was built from
+        """
+
+        with gzip.open(tree_file + '.tmp', 'wt', encoding='utf-8') as file:
+            file.write('{} {} {}\n'.format(BK_TREE_MAGIC, BK_TREE_VERSION, source_checksum))
+            for word, parent_index, distance in self.nodes:
+                file.write('{} {} {}\n'.format(word, parent_index, distance))
+        os.replace(tree_file + '.tmp', tree_file)
+
+    @classmethod
+    def load(cls, tree_file):
+        """
+        The load function rebuilds a tree saved by save(), hanging each node under its recorded parent and distance.
+        :param tree_file: path of the tree file
+        :return: BKTree with the source_checksum from the tree file header
+        """
+
+        tree = cls()
+        with gzip.open(tree_file, 'rt', encoding='utf-8') as file:
+            header = file.readline().split()
+            if len(header) != 3 or header[0] != BK_TREE_MAGIC or header[1] != str(BK_TREE_VERSION):
+                raise ValueError('The tree file has an unsupported format: ' + tree_file)
+
+            nodes = []
+            for line in file:
+                word, parent_index, distance = line.split()
+                parent_index, distance = int(parent_index), int(distance)
+                node = [word, dict(), len(nodes)]
+                if parent_index < 0:
+                    tree.root = node
+                else:
+                    nodes[parent_index][1][distance] = node
+                nodes.append(node)
+                tree.nodes.append((word, parent_index, distance))
+
+        tree.source_checksum = int(header[2])
+
+        return tree
+
+
+def load_bk_tree(dictionary_file, tree_file):
+    """
+    The load_bk_tree function reads the tree file built from the current contents of the dictionary file, or builds
+    the BKTree from the dictionary file and saves it when the tree file is missing, unreadable or stale.
+    :param dictionary_file: path of the dictionary file
+    :param tree_file: path of the tree file
+    :return: BKTree of the dictionary words
+    """
+
+    try:
+        tree = BKTree.load(tree_file)
+    except (OSError, ValueError, EOFError):
+        tree = None
+
+    source_checksum = file_checksum(dictionary_file)
+    if tree is None or tree.source_checksum != source_checksum:
+        tree = BKTree(sorted(ProcessFiles(dictionary_file).process_input()))
+        tree.save(tree_file, source_checksum)
+
+    return tree
+
+
+class LevenshteinAutomaton:
+    """
+    The LevenshteinAutomaton class is a deterministic automaton accepting the words within max_distance
+    Damerau-Levenshtein edits of a query word, with its states and transitions built lazily as they are reached.
+    A state is the last max_distance + 1 rows of the Damerau-Levenshtein table, with every distance above
+    max_distance capped to max_distance + 1, paired with the letter read for each row. Older rows and larger
+    distances can never bring a word back within max_distance, so this window is all a transposition needs.
+    Letters which don't occur in the query behave identically and share one transition, so the number of states and
+    transitions depends on the query and max_distance only, never on the dictionary.
+    """
+
+    def __init__(self, word, max_distance=2):
+        self.word = word
+        self.max_distance = max_distance
+        self.letters = set(word)
+        self.transitions = dict()
+
+        cap = max_distance + 1
+        first_row = tuple(min(column, cap) for column in range(len(word) + 1))
+        self.start = ((first_row, None),), min(first_row)
+
+    def step(self, state, letter):
+        """
+        The step function follows the transition of the state on the letter, computing it the first time it is
+        needed.
+        :param state: an automaton state, starting with start
+        :param letter: the next letter of the dictionary word
+        :return: the next state, or None when no word continuing this way can be within max_distance
+        """
+
+        letter = letter if letter in self.letters else None
+        key = (state, letter)
+        try:
+            return self.transitions[key]
+        except KeyError:
+            pass
+
+        window, floor = state
+        word = self.word
+        max_distance = self.max_distance
+        cap = max_distance + 1
+        previous = window[-1][0]
+        row = [min(previous[0] + 1, cap)]
+        last_column = 0
+
+        for j in range(1, len(word) + 1):
+            query_letter = word[j - 1]
+            l = last_column
+            if letter == query_letter:
+                distance = previous[j - 1]
+                last_column = j
+            else:
+                distance = previous[j - 1] + 1
+            distance = min(distance, row[j - 1] + 1, previous[j] + 1)
+
+            # The most recent row whose letter is this query letter, if it is still inside the window
+            if l:
+                for position in range(len(window) - 1, 0, -1):
+                    if window[position][1] == query_letter:
+                        rows_between = len(window) - 1 - position
+                        distance = min(distance, window[position - 1][0][l - 1] + rows_between + 1 + (j - l - 1))
+                        break
+
+            row.append(min(distance, cap))
+
+        row = tuple(row)
+        floor = min(min(row), floor + 1, cap)
+        if floor > max_distance:
+            next_state = None
+        else:
+            next_state = (window[-max_distance:] + ((row, letter),), floor)
+        self.transitions[key] = next_state
+
+        return next_state
+
+    def distance(self, state):
+        """
+        The distance function reads the distance between the query and the word spelled so far off a state.
+        :param state: an automaton state
+        :return: the Damerau-Levenshtein distance, or max_distance + 1 for anything further away
+        """
+
+        return state[0][-1][0][-1]
+
+    def intersect(self, root):
+        """
+        The intersect function traverses the automaton and the Trie together from their start state and root, only
+        following Trie edges whose letter leads to a live automaton state.
+        :param root: the root Node of a Trie or DAWG
+        :return: list of (word, distance) tuples for the accepted dictionary words
+        """
+
+        max_distance = self.max_distance
+        step = self.step
+        matches = []
+
+        if root.end and self.distance(self.start) <= max_distance:
+            matches.append(('', self.distance(self.start)))
+
+        stack = [(root, self.start, '')]
+        while stack:
+            node, state, prefix = stack.pop()
+            for letter, child in node.items():
+                next_state = step(state, letter)
+                if next_state is not None:
+                    if child.end and next_state[0][-1][0][-1] <= max_distance:
+                        matches.append((prefix + letter, next_state[0][-1][0][-1]))
+                    if child.children:
+                        stack.append((child, next_state, prefix + letter))
+
+        return matches
+
+
+class BatchEditDistance:
+    """
+    The BatchEditDistance class computes the Damerau-Levenshtein distance from a query to many candidate words at
+    once with NumPy. The candidates are encoded as a padded integer matrix (one row per word, 0 for padding), and
+    the table of the Wikipedia algorithm gets an extra axis over the candidates: each cell update, including the
+    last-row and last-column bookkeeping of transpositions, is one vector operation across a chunk of candidates.
+    The distance of each candidate is read off the row of its own length, so padding never affects it. Candidates
+    are processed in chunks of similar length, so short words don't pay for the rows of the longest one.
+    """
+
+    def __init__(self, words, chunk_size=8192):
+        if numpy is None:
+            raise ImportError('BatchEditDistance needs NumPy, please install it with pip install numpy')
+
+        self.words = list(words)
+        self.chunk_size = chunk_size
+        self.codes = {letter: code for code, letter in
+                      enumerate(sorted({letter for word in self.words for letter in word}), 1)}
+
+        self.order = sorted(range(len(self.words)), key=lambda index: len(self.words[index]))
+        longest = max((len(word) for word in self.words), default=0)
+        self.encoded = numpy.zeros((len(self.words), longest), dtype=numpy.int32)
+        self.lengths = numpy.zeros(len(self.words), dtype=numpy.int64)
+        for position, index in enumerate(self.order):
+            word = self.words[index]
+            self.encoded[position, :len(word)] = [self.codes[letter] for letter in word]
+            self.lengths[position] = len(word)
+        self.order = numpy.array(self.order, dtype=numpy.int64)
+
+    def distances(self, query):
+        """
+        The distances function computes the distance from the query to every candidate word.
+        :param query: the query word
+        :return: NumPy array of distances, in the order of the candidate words
+        """
+
+        distances = numpy.empty(len(self.words), dtype=numpy.int64)
+        for start in range(0, len(self.words), self.chunk_size):
+            lengths = self.lengths[start:start + self.chunk_size]
+            encoded = self.encoded[start:start + self.chunk_size, :lengths[-1]]
+            distances[self.order[start:start + self.chunk_size]] = self.chunk_distances(query, encoded, lengths)
+
+        return distances
+
+    def distances_many(self, queries):
+        """
+        The distances_many function computes the distances from a batch of queries to every candidate word.
+        :param queries: iterable of query words
+        :return: NumPy array with one row of distances per query
+        """
+
+        queries = list(queries)
+        distances = numpy.empty((len(queries), len(self.words)), dtype=numpy.int64)
+        for index, query in enumerate(queries):
+            distances[index] = self.distances(query)
+
+        return distances
+
+    def chunk_distances(self, query, encoded, lengths):
+        """
+        The chunk_distances function runs the Damerau-Levenshtein table for one chunk of candidates. Letters of the
+        query which no candidate contains get negative codes, so they never match a candidate letter or padding.
+        :param query: the query word
+        :param encoded: padded integer matrix of the candidate words
+        :param lengths: lengths of the candidate words
+        :return: NumPy array of distances for the chunk
+        """
+
+        count, longest = encoded.shape
+        width = len(query)
+        max_distance = longest + width
+        query_codes = [self.codes.get(letter, -1 - position) for position, letter in enumerate(query)]
+        query_letters = {code: index for index, code in enumerate(dict.fromkeys(query_codes))}
+        candidates = numpy.arange(count)
+
+        # table[i + 1, :, j + 1] holds the distance between the first i candidate letters and the first j query letters
+        table = numpy.empty((longest + 2, count, width + 2), dtype=numpy.int32)
+        table[0] = max_distance
+        table[1:, :, 0] = max_distance
+        table[1:, :, 1] = numpy.arange(longest + 1)[:, None]
+        table[1, :, 1:] = numpy.arange(width + 1)
+        last_row = numpy.zeros((count, len(query_letters)), dtype=numpy.int64)
+
+        for i in range(1, longest + 1):
+            letters = encoded[:, i - 1]
+            previous = table[i]
+            row = table[i + 1]
+            last_column = numpy.zeros(count, dtype=numpy.int64)
+            for j in range(1, width + 1):
+                query_code = query_codes[j - 1]
+                k = last_row[:, query_letters[query_code]]
+                l = last_column
+                matches = letters == query_code
+                distance = numpy.minimum(previous[:, j] + (~matches), row[:, j] + 1)
+                distance = numpy.minimum(distance, previous[:, j + 1] + 1)
+                transposition = table[k, candidates, l] + (i - k - 1) + 1 + (j - l - 1)
+                row[:, j + 1] = numpy.minimum(distance, transposition)
+                last_column = numpy.where(matches, j, last_column)
+            for query_code, index in query_letters.items():
+                last_row[:, index] = numpy.where(letters == query_code, i, last_row[:, index])
+
+        return table[lengths + 1, candidates, width + 1]
+
+    def within(self, query, max_distance=2):
+        """
+        The within function keeps the candidate words within max_distance of the query.
+        :param query: the query word
+        :param max_distance: largest edit distance of the returned words
+        :return: list of (word, distance) tuples, closest first, then alphabetically
+        """
+
+        distances = self.distances(query)
+        suggestions = [(self.words[index], int(distances[index]))
+                       for index in numpy.flatnonzero(distances <= max_distance)]
+        suggestions.sort(key=lambda suggestion: (suggestion[1], suggestion[0]))
+
+        return suggestions
+
+
+class SpellCheck(object):
+    """
+    The Spellcheck class adds all dictionary file words into the Trie in order to cross reference the word list against
+    the input file Trie. The __init__ adds the dictionary file's words into its own Trie then checks if the input
+    file's words are in the dictionary Trie. If the input file's words can't be found, they're printed out as
+    incorrect words.
+    """
+
+    def __init__(self, processed_dictionary, backend='trie', words=None, frequencies=None, cache_size=1024,
+                 instrumentation=None, filter_rate=None, hit_set_size=0):
+        self.processed_dictionary = processed_dictionary
+        self.words = TRIE_BACKENDS[backend]() if words is None else words
+        self.instrumentation = Instrumentation() if instrumentation is None else instrumentation
+
+        with self.instrumentation.span('trie build') as span:
+            # Backends such as the DAWG can only be built from words in sorted order
+            if getattr(self.words, 'sorted_input', False):
+                processed_dictionary = sorted(processed_dictionary)
+
+            for word in processed_dictionary:
+                self.words.add(word)
+                span.count += 1
+
+            # Backends which build lazily are finished here, so their build isn't timed as a lookup
+            finish = getattr(self.words, 'finish', None)
+            if finish is not None:
+                finish()
+
+        self.delete_index = None
+        self.bk_tree = None
+        self.batch_distance = None
+        self.trie_rows = 0
+        self.frequencies = WordFrequencies() if frequencies is None else frequencies
+        self.cache = LRUCache(cache_size)
+        self.cache_frequencies = self.frequencies
+        self.dictionary_version = self.words.version
+        self.completion_frequencies = None
+
+        # Optional fast paths in front of the Trie, see contains()
+        self.filter_rate = filter_rate
+        self.hit_set_size = hit_set_size
+        self.bloom_filter = None
+        self.hit_set = set()
+        self.filter_version = None
+        self.filter_rejects = 0
+        self.filter_false_positives = 0
+        self.hit_set_hits = 0
+        self.build_filters(processed_dictionary)
+
+    def spellcheck(self, word):
+        """
+        The spellcheck function determines whether the words in the input Trie are in the dictionary Trie. If the
+        input words aren't found in the dictionary, the words are appended into the incorrect_words list, printed,
+        and then returned as a list.
+        :param word:
+        :return: incorrect_words list
+        """
+
+        incorrect_words = []
+
+        if not self.contains(word):
+            incorrect_words.append(word)
+            print(word)
+
+        return incorrect_words
+
+    def check_many(self, words):
+        """
+        The check_many function checks a whole batch of words in one pass and returns the ones which aren't in the
+        dictionary Trie, without printing them. The Trie's search method is looked up once for the whole batch
+        instead of once per word, which makes this much cheaper than calling spellcheck() in a loop.
+        :param words: iterable of words to check
+        :return: list of the words not found in the dictionary, in input order
+        """
+
+        with self.instrumentation.span('lookup') as span:
+            if self.filter_rate is None and not self.hit_set_size:
+                contains = self.words.__contains__
+            else:
+                contains = self.contains
+            incorrect_words = []
+            for word in words:
+                span.count += 1
+                if not contains(word):
+                    incorrect_words.append(word)
+
+        return incorrect_words
+
+    def check_stream(self, occurrences):
+        """
+        The check_stream function checks a stream of word occurrences, such as ProcessFiles.positions(), and yields
+        the misspelled ones as they come, so nothing but the verdicts is kept in memory. Each distinct word is
+        searched in the dictionary once; its verdict is cached in a dict, so repeated words cost one dict probe.
+        :param occurrences: iterable of tuples whose first item is the word, such as (word, line, column, offset)
+        :return: generator of the occurrence tuples of words not found in the dictionary, in input order
+        """
+
+        if self.filter_rate is None and not self.hit_set_size:
+            contains = self.words.__contains__
+        else:
+            contains = self.contains
+
+        verdicts = dict()
+        for occurrence in occurrences:
+            word = occurrence[0]
+            verdict = verdicts.get(word)
+            if verdict is None:
+                verdict = verdicts[word] = contains(word)
+            if not verdict:
+                yield occurrence
+
+    def contains(self, word):
+        """
+        The contains function checks one word through the fast paths in front of the dictionary Trie: the hit set
+        answers words already found in the Trie with one hash lookup, and the Bloom filter rejects most misses with
+        a few bit probes. Only words which pass the filter without being in the hit set walk the Trie.
+        :param word: the word to check
+        :return: True or False depending on whether or not the word is in the dictionary
+        """
+
+        if self.filter_version != self.words.version:
+            self.build_filters()
+
+        if word in self.hit_set:
+            self.hit_set_hits += 1
+            return True
+
+        if self.bloom_filter is not None and word not in self.bloom_filter:
+            self.filter_rejects += 1
+            return False
+
+        if word not in self.words:
+            if self.bloom_filter is not None:
+                self.filter_false_positives += 1
+            return False
+
+        if len(self.hit_set) < self.hit_set_size:
+            self.hit_set.add(word)
+        return True
+
+    def build_filters(self, processed_dictionary=()):
+        """
+        The build_filters function builds the Bloom filter over the dictionary words, when the SpellCheck has a
+        filter_rate, and empties the hit set. It runs from __init__ and again whenever the dictionary Trie has been
+        changed other than through update_dictionary().
+        :param processed_dictionary: the dictionary words, read back from the dictionary Trie when empty
+        """
+
+        self.hit_set = set()
+        self.filter_version = self.words.version
+        if self.filter_rate is None:
+            return
+
+        with self.instrumentation.span('filter build') as span:
+            words = list(processed_dictionary) or list(self.words)
+            self.bloom_filter = BloomFilter(len(words), self.filter_rate)
+            for word in words:
+                self.bloom_filter.add(word)
+            span.count = len(words)
+
+    def __getstate__(self):
+        # The Bloom filter is keyed by string hashes, which differ in every process, so it's rebuilt after unpickling
+        state = self.__dict__.copy()
+        state['bloom_filter'] = None
+        state['filter_version'] = None
+        return state
+
+    def filter_stats(self):
+        """
+        The filter_stats function reports how the fast paths in front of the dictionary Trie performed. The
+        measured false positive rate is the share of misses which passed the Bloom filter and walked the Trie.
+        :return: dict of the Bloom filter and hit set sizes and counters
+        """
+
+        misses = self.filter_rejects + self.filter_false_positives
+        stats = {'filter': self.bloom_filter.stats() if self.bloom_filter is not None else None,
+                 'filter_rejects': self.filter_rejects, 'filter_false_positives': self.filter_false_positives,
+                 'false_positive_rate': self.filter_false_positives / misses if misses else 0.0,
+                 'hit_set_size': len(self.hit_set), 'hit_set_capacity': self.hit_set_size,
+                 'hit_set_bytes': sys.getsizeof(self.hit_set), 'hit_set_hits': self.hit_set_hits}
+
+        return stats
+
+    def suggest(self, word, max_distance=2, strategy='trie'):
+        """
+        The suggest function finds every dictionary word within max_distance Damerau-Levenshtein edits of the word,
+        using one of the SUGGESTION_STRATEGIES: 'trie' walks the dictionary Trie (see trie_suggest()), 'symspell'
+        probes a SymmetricDeleteIndex built on first use (see build_delete_index()), 'bktree' searches a BKTree
+        built on first use (see build_bk_tree()), 'automaton' intersects a LevenshteinAutomaton of the word with
+        the dictionary Trie (see automaton_suggest()) and 'batch' computes the distance to every dictionary word at
+        once with a BatchEditDistance built on first use (see build_batch_distance()), which needs NumPy.
+        :param word: the misspelled word
+        :param max_distance: largest edit distance of the suggestions
+        :param strategy: name of the suggestion strategy
+        :return: list of (suggestion, distance) tuples, closest first, then alphabetically
+        """
+
+        if strategy not in SUGGESTION_STRATEGIES:
+            raise ValueError('Unknown suggestion strategy: ' + repr(strategy))
+
+        word = word.lower()
+        self.invalidate_if_changed()
+
+        key = ('suggest', word, max_distance, strategy)
+        suggestions = self.cache.get(key)
+        if suggestions is None:
+            with self.instrumentation.span('suggest', 1):
+                if strategy == 'trie':
+                    suggestions = self.trie_suggest(word, max_distance)
+                elif strategy == 'symspell':
+                    if self.delete_index is None or self.delete_index.max_distance < max_distance:
+                        self.build_delete_index(max_distance)
+                    suggestions = self.delete_index.lookup(word, max_distance)
+                elif strategy == 'bktree':
+                    if self.bk_tree is None:
+                        self.build_bk_tree()
+                    suggestions = self.bk_tree.search(word, max_distance)
+                elif strategy == 'batch':
+                    if self.batch_distance is None:
+                        self.build_batch_distance()
+                    suggestions = self.batch_distance.within(word, max_distance)
+                else:
+                    suggestions = self.automaton_suggest(word, max_distance)
+            self.cache.put(key, suggestions)
+
+        return list(suggestions)
+
+    def update_dictionary(self, added=(), removed=()):
+        """
+        The update_dictionary function applies a delta to the dictionary Trie at runtime, without rebuilding it.
+        Removed words are removed first, so a word both added and removed ends up in the dictionary. The cached
+        suggestions and corrections and the suggestion indexes are dropped on the next suggest() or correct().
+        Removing words needs a backend with a remove_many method, such as the 'trie' backend.
+        :param added: iterable of words to add to the dictionary
+        :param removed: iterable of words to remove from the dictionary
+        :return: number of words which were in the dictionary and have been removed
+        """
+
+        removed = list(removed)
+        added = list(added)
+        filters_current = self.filter_version == self.words.version
+        removed_count = 0
+        if removed:
+            remove_many = getattr(self.words, 'remove_many', None)
+            if remove_many is None:
+                raise ValueError('The {} backend doesn\'t support removing words'.format(type(self.words).__name__))
+            removed_count = remove_many(removed)
+
+        add_many = getattr(self.words, 'add_many', None)
+        if add_many is not None:
+            add_many(added, self.frequencies.counts)
+        else:
+            for word in added:
+                self.words.add(word)
+
+        # The fast paths are patched in place: removed words leave the hit set, and their bits stay set in the
+        # Bloom filter, which only costs a Trie walk when they are checked
+        if filters_current:
+            self.hit_set.difference_update(removed)
+            if self.bloom_filter is not None:
+                for word in added:
+                    self.bloom_filter.add(word)
+            self.filter_version = self.words.version
+
+        return removed_count
+
+    def complete(self, prefix, k=10):
+        """
+        The complete function finds the k most frequent dictionary words starting with the prefix, ranked by the
+        SpellCheck's word frequencies (see Trie.complete()). The frequencies are copied into the Trie on first use
+        and again whenever the frequencies are replaced. Completion needs the 'trie' backend.
+        :param prefix: the beginning of the words
+        :param k: number of completions
+        :return: list of (word, frequency) tuples, most frequent first, then alphabetically
+        """
+
+        complete = getattr(self.words, 'complete', None)
+        if complete is None:
+            raise ValueError('The {} backend doesn\'t support completion'.format(type(self.words).__name__))
+
+        if self.completion_frequencies is not self.frequencies:
+            self.words.set_frequencies(self.frequencies.counts)
+            self.completion_frequencies = self.frequencies
+
+        with self.instrumentation.span('complete', 1):
+            return complete(prefix.lower(), k)
+
+    def invalidate_if_changed(self):
+        """
+        The invalidate_if_changed function drops the cached suggestions and corrections, the symmetric delete index,
+        the BK-tree and the BatchEditDistance once words have been added to or removed from the dictionary Trie since
+        they were computed.
+        The cache alone is also dropped once the frequencies ranking the corrections have been replaced.
+        """
+
+        if self.words.version != self.dictionary_version:
+            self.cache.clear()
+            self.delete_index = None
+            self.bk_tree = None
+            self.batch_distance = None
+            self.dictionary_version = self.words.version
+
+        if self.cache_frequencies is not self.frequencies:
+            self.cache.clear()
+            self.cache_frequencies = self.frequencies
+
+    def metrics(self):
+        """
+        The metrics function reports the time spent in each instrumented phase of this SpellCheck.
+        :return: dict mapping each span name to its number of calls, total duration_ns and total count
+        """
+
+        return self.instrumentation.report()
+
+    def cache_stats(self):
+        """
+        The cache_stats function reports the counters of the suggestion and correction cache.
+        :return: dict of the cache capacity, size, hits, misses, evictions and hit rate
+        """
+
+        return self.cache.stats()
+
+    def build_delete_index(self, max_distance=2):
+        """
+        The build_delete_index function precomputes a SymmetricDeleteIndex over the dictionary words, which makes
+        'symspell' suggestions independent of the Trie walk.
+        :param max_distance: largest edit distance the index can answer
+        :return: the SymmetricDeleteIndex
+        """
+
+        self.delete_index = SymmetricDeleteIndex(self.words, max_distance)
+
+        return self.delete_index
+
+    def build_bk_tree(self, bk_tree=None):
+        """
+        The build_bk_tree function indexes the dictionary words in a BKTree for 'bktree' suggestions, or installs
+        a BKTree loaded with load_bk_tree() so it doesn't have to be rebuilt.
+        :param bk_tree: a BKTree of the dictionary words, built from the dictionary Trie when omitted
+        :return: the BKTree
+        """
+
+        self.invalidate_if_changed()
+        self.bk_tree = BKTree(self.words) if bk_tree is None else bk_tree
+
+        return self.bk_tree
+
+    def build_batch_distance(self, chunk_size=8192):
+        """
+        The build_batch_distance function encodes the dictionary words in a BatchEditDistance for 'batch'
+        suggestions, which computes their exact distances to a word with NumPy instead of pruning a search.
+        :param chunk_size: number of dictionary words per vectorized chunk
+        :return: the BatchEditDistance
+        """
+
+        self.invalidate_if_changed()
+        self.batch_distance = BatchEditDistance(self.words, chunk_size)
+
+        return self.batch_distance
+
+    def trie_suggest(self, word, max_distance=2):
+        """
+        The trie_suggest function finds every dictionary word within max_distance Damerau-Levenshtein edits of the word
+        by walking the dictionary Trie depth first. Each Trie node on the current path adds one row of the
+        Damerau-Levenshtein table, so words sharing a prefix share its rows. The rows of the whole path are kept,
+        along with the last row each letter appeared on, which is what transpositions need. The number of rows
+        computed by the last call is kept in trie_rows.
+        A subtree is pruned once no row below it can come back within max_distance: a row can't be smaller than
+        the previous row minimum, or than an earlier row minimum plus one per row in between.
+        :param word: the misspelled word
+        :param max_distance: largest edit distance of the suggestions
+        :return: list of (suggestion, distance) tuples, closest first, then alphabetically
+        """
+
+        root = getattr(self.words, 'root', None)
+        if root is None:
+            raise TypeError('Suggestions need a Node based dictionary Trie, not ' + type(self.words).__name__)
+
+        length = len(word)
+        infinity = length + max_distance + 2
+        rows = [[infinity] * (length + 2), [infinity] + list(range(length + 1))]
+        last_row = dict()
+        suggestions = []
+        row_count = [0]
+
+        def search(node, letter, prefix, floor):
+            row_count[0] += 1
+            i = len(rows) - 1
+            previous = rows[i]
+            row = [infinity, i]
+            last_column = 0
+            for j in range(1, length + 1):
+                query_letter = word[j - 1]
+                k = last_row.get(query_letter, 0)
+                l = last_column
+                if letter == query_letter:
+                    cost = 0
+                    last_column = j
+                else:
+                    cost = 1
+                distance = min(previous[j] + cost, row[j] + 1, previous[j + 1] + 1)
+                if k and l:
+                    distance = min(distance, rows[k][l] + (i - k - 1) + 1 + (j - l - 1))
+                row.append(distance)
+
+            if node.end and row[-1] <= max_distance:
+                suggestions.append((prefix, row[-1]))
+
+            floor = min(min(row), floor + 1)
+            if floor <= max_distance and node.children:
+                rows.append(row)
+                previous_last_row = last_row.get(letter, 0)
+                last_row[letter] = i
+                for next_letter, child in node.items():
+                    search(child, next_letter, prefix + next_letter, floor)
+                last_row[letter] = previous_last_row
+                rows.pop()
+
+        if root.end and length <= max_distance:
+            suggestions.append(('', length))
+        for letter, child in root.items():
+            search(child, letter, letter, 0)
+        self.trie_rows = row_count[0]
+
+        suggestions.sort(key=lambda suggestion: (suggestion[1], suggestion[0]))
+
+        return suggestions
+
+    def automaton_suggest(self, word, max_distance=2):
+        """
+        The automaton_suggest function builds a LevenshteinAutomaton for the word and intersects it with the
+        dictionary Trie. Only the Trie edges leading to live automaton states are followed, and every transition is
+        computed once per query, so Trie nodes sharing an automaton state cost one dict lookup each.
+        :param word: the misspelled word
+        :param max_distance: largest edit distance of the suggestions
+        :return: list of (suggestion, distance) tuples, closest first, then alphabetically
+        """
+
+        root = getattr(self.words, 'root', None)
+        if root is None:
+            raise TypeError('Suggestions need a Node based dictionary Trie, not ' + type(self.words).__name__)
+
+        suggestions = LevenshteinAutomaton(word, max_distance).intersect(root)
+        suggestions.sort(key=lambda suggestion: (suggestion[1], suggestion[0]))
+
+        return suggestions
+
+    def known(self, words):
+        """
+        The known function keeps the words which are in the dictionary Trie.
+        :param words: iterable of candidate words
+        :return: set of the candidate words found in the dictionary
+        """
+
+        contains = self.words.__contains__
+        return {word for word in words if contains(word)}
+
+    def edits1(self, word):
+        """
+        The edits1 function generates every string one edit away from the word: splits of the word into two halves
+        give the deletes, transposes, replaces and inserts of Norvig's corrector.
+        :param word: the word to edit
+        :return: set of strings one edit away from the word
+        """
+
+        letters = CORRECTION_LETTERS
+        splits = [(word[:position], word[position:]) for position in range(len(word) + 1)]
+        deletes = [left + right[1:] for left, right in splits if right]
+        transposes = [left + right[1] + right[0] + right[2:] for left, right in splits if len(right) > 1]
+        replaces = [left + letter + right[1:] for left, right in splits if right for letter in letters]
+        inserts = [left + letter + right for left, right in splits for letter in letters]
+
+        return set(deletes + transposes + replaces + inserts)
+
+    def correct(self, word):
+        """
+        The correct function returns the most probable spelling correction of the word, following Norvig: the word
+        itself if it is in the dictionary, otherwise the known words one edit away, otherwise two edits away, ranked
+        by their probability in the corpus frequencies. Ties are broken alphabetically.
+        :param word: the word to correct
+        :return: the most probable correction, or the word itself when no known word is within two edits
+        """
+
+        word = word.lower()
+        self.invalidate_if_changed()
+
+        key = ('correct', word, 2)
+        correction = self.cache.get(key)
+        if correction is None:
+            with self.instrumentation.span('correct', 1):
+                candidates = (self.known([word]) or self.known(self.edits1(word)) or
+                              self.known(edit2 for edit1 in self.edits1(word) for edit2 in self.edits1(edit1)) or
+                              {word})
+                correction = max(sorted(candidates), key=self.frequencies.probability)
+            self.cache.put(key, correction)
+
+        return correction
+
+
+def file_checksum(file_name):
+    """
+    The file_checksum function computes the CRC-32 of a file in fixed size chunks. It is stored in the header of a
+    compiled dictionary index so that an index built from an older version of the dictionary is detected.
+    :param file_name: path of the file to checksum
+    :return: CRC-32 of the file contents
+    """
+
+    checksum = 0
+    with open(file_name, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            checksum = zlib.crc32(chunk, checksum)
+
+    return checksum
+
+
+def compile_index(dictionary_file, index_file):
+    """
+    The compile_index function builds a DoubleArrayTrie from the dictionary file and saves it as an index file.
+    :param dictionary_file: path of the dictionary file
+    :param index_file: path of the index file to write
+    :return: the built DoubleArrayTrie
+    """
+
+    trie = DoubleArrayTrie()
+    for word in ProcessFiles(dictionary_file).load_dictionary():
+        trie.add(word)
+    trie.save(index_file, file_checksum(dictionary_file))
+
+    return trie
+
+
+def load_index(dictionary_file, index_file):
+    """
+    The load_index function memory-maps the index file if it was compiled from the current contents of the
+    dictionary file. Missing, unreadable or stale index files are rebuilt from the dictionary file automatically.
+    :param dictionary_file: path of the dictionary file the index was compiled from
+    :param index_file: path of the index file
+    :return: DoubleArrayTrie backed by the index file
+    """
+
+    try:
+        trie = DoubleArrayTrie.load(index_file)
+    except (OSError, ValueError):
+        trie = None
+
+    if trie is None or trie.source_checksum != file_checksum(dictionary_file):
+        trie = None
+        if os.path.exists(index_file):
+            print('Rebuilding stale dictionary index ' + index_file, file=sys.stderr)
+        else:
+            print('Building dictionary index ' + index_file, file=sys.stderr)
+        compile_index(dictionary_file, index_file)
+        trie = DoubleArrayTrie.load(index_file)
+
+    return trie
+
+
+def compile_command(argv):
+    """
+    The compile_command function implements 'spellcheck compile DICT -o dict.idx', which compiles a dictionary
+    file into an index file that later runs can load with --index.
+    :param argv: command line arguments following 'compile'
+    """
+
+    parser = argparse.ArgumentParser(prog='spellcheck compile',
+                                     description='''Compile a dictionary file into a memory-mapped index.''')
+    parser.add_argument('d', type=str, help='The dictionary file to compile.')
+    parser.add_argument('-o', '--output', type=str, default='dict.idx', help='The index file to write.')
+    args = parser.parse_args(argv)
+
+    start_compile = time.time()
+    try:
+        trie = compile_index(args.d, args.output)
+    except DictionaryFormatError as error:
+        print(error)
+        print('The dictionary file hasn\'t been formatted properly, please format your file correctly!')
+        sys.exit()
+
+    print('Compiled ' + str(sum(trie.end)) + ' words into ' + args.output + ' in ' +
+          str(time.time() - start_compile) + ' seconds')
+
+
+shared_spell_check = None
+
+
+def share_spell_check(spell_check):
+    """
+    The share_spell_check function installs the SpellCheck used by check_range() in a worker process.
+    :param spell_check: SpellCheck holding the dictionary Trie
+    """
+
+    global shared_spell_check
+    shared_spell_check = spell_check
+
+
+def check_range(byte_range):
+    """
+    The check_range function reads, tokenizes and checks one byte range of the input file against the shared
+    SpellCheck of the worker process, skipping digits and ordinal numbers like the serial check does.
+    :param byte_range: (input file, start, stop) tuple, as made from ProcessFiles.byte_ranges()
+    :return: list of the distinct words of the range not found in the dictionary
+    """
+
+    input_file, start, stop = byte_range
+    words = {word for word in ProcessFiles(input_file).tokens(start=start, stop=stop) if not re.match(r'\d+', word)}
+
+    # The worker's copy of the SpellCheck inherits the parent's sinks, whose 'parallel check' span already covers it
+    if shared_spell_check.instrumentation.sinks:
+        shared_spell_check.instrumentation = Instrumentation()
+
+    return shared_spell_check.check_many(words)
+
+
+def check_parallel(spell_check, input_file, jobs):
+    """
+    The check_parallel function splits the input file into byte ranges aligned on whitespace and has a pool of
+    worker processes read, tokenize and check one range at a time, so the whole check runs in parallel and not
+    only the dictionary lookups. There are four ranges per worker to balance the load. Where the platform can fork,
+    the workers inherit the already built dictionary Trie instead of rebuilding it; otherwise the SpellCheck is
+    pickled once per worker, which for a memory-mapped index only sends the index file path.
+    :param spell_check: SpellCheck holding the dictionary Trie
+    :param input_file: path of the input file
+    :param jobs: number of worker processes
+    :return: sorted list of the distinct words not found in the dictionary, the same for any number of jobs
+    """
+
+    byte_ranges = [(input_file, start, stop) for start, stop in ProcessFiles(input_file).byte_ranges(jobs * 4)]
+
+    if 'fork' in multiprocessing.get_all_start_methods():
+        share_spell_check(spell_check)
+        executor = ProcessPoolExecutor(jobs, mp_context=multiprocessing.get_context('fork'))
+    else:
+        executor = ProcessPoolExecutor(jobs, initializer=share_spell_check, initargs=(spell_check,))
+
+    with executor:
+        incorrect_words = set()
+        for range_result in executor.map(check_range, byte_ranges):
+            incorrect_words.update(range_result)
+
+    return sorted(incorrect_words)
+
+
+def symspell_command(argv):
+    """
+    The symspell_command function implements 'spellcheck symspell DICT', which measures the SymmetricDeleteIndex on
+    a dictionary: build time, memory footprint and lookup latency for each requested distance. The queries are the
+    misspelled words of an input file, or single edits of dictionary words when no input file is given.
+    :param argv: command line arguments following 'symspell'
+    """
+
+    parser = argparse.ArgumentParser(prog='spellcheck symspell',
+                                     description='''Measure the symmetric delete suggestion index.''')
+    parser.add_argument('d', type=str, help='The dictionary file to index.')
+    parser.add_argument('-k', '--distance', type=int, nargs='+', default=[1, 2],
+                        help='The edit distances to build the index for.')
+    parser.add_argument('-i', '--input', type=str, help='An input file whose misspelled words are used as queries.')
+    parser.add_argument('-n', '--queries', type=int, default=1000, help='The maximum number of queries.')
+    args = parser.parse_args(argv)
+
+    check_spelling = SpellCheck(ProcessFiles(args.d).process_input())
+    queries = benchmark_queries(check_spelling, args.input, args.queries)
+
+    for max_distance in args.distance:
+        start_build = time.perf_counter()
+        index = check_spelling.build_delete_index(max_distance)
+        build_time = time.perf_counter() - start_build
+
+        latencies = [measure(index.lookup, query) for query in queries]
+
+        print('k={}: {} deletes from {} words, built in {:.3f} s, {:.1f} MB'.format(
+            max_distance, len(index.deletes), index.word_count, build_time, index.size() / 1e6))
+        print('     ' + latency_summary(latencies))
+
+
+def bktree_command(argv):
+    """
+    The bktree_command function implements 'spellcheck bktree DICT', which builds (or loads) the BKTree of a
+    dictionary and compares it with the Trie walk of trie_suggest() on the same queries: distances computed per
+    query (whole-word distances for the BKTree, Damerau-Levenshtein rows for the Trie) and lookup latency.
+    :param argv: command line arguments following 'bktree'
+    """
+
+    parser = argparse.ArgumentParser(prog='spellcheck bktree',
+                                     description='''Compare BK-tree and Trie walk suggestions.''')
+    parser.add_argument('d', type=str, help='The dictionary file to index.')
+    parser.add_argument('-o', '--output', type=str, default='dict.bk', help='The BK-tree file, rebuilt if stale.')
+    parser.add_argument('-k', '--distance', type=int, default=2, help='The edit distance of the suggestions.')
+    parser.add_argument('-i', '--input', type=str, help='An input file whose misspelled words are used as queries.')
+    parser.add_argument('-n', '--queries', type=int, default=200, help='The maximum number of queries.')
+    args = parser.parse_args(argv)
+
+    check_spelling = SpellCheck(ProcessFiles(args.d).process_input())
+    queries = benchmark_queries(check_spelling, args.input, args.queries)
+
+    start_build = time.perf_counter()
+    bk_tree = check_spelling.build_bk_tree(load_bk_tree(args.d, args.output))
+    print('BK-tree of {} words loaded or built in {:.3f} s'.format(len(bk_tree.nodes),
+                                                                   time.perf_counter() - start_build))
+
+    for name, search, counter in (('bktree', bk_tree.search, lambda: bk_tree.distance_count),
+                                  ('trie', check_spelling.trie_suggest, lambda: check_spelling.trie_rows)):
+        latencies = []
+        touched = 0
+        for query in queries:
+            latencies.append(measure(search, query, args.distance))
+            touched += counter()
+        print('{}: {:.1f} distances per query, {}'.format(name, touched / max(1, len(queries)),
+                                                          latency_summary(latencies)))
+
+
+def stats_command(argv):
+    """
+    The stats_command function implements 'spellcheck stats DICT', which builds the dictionary Trie and prints its
+    Trie.stats(), along with the memory traced by tracemalloc during the build as a cross-check of the deep size.
+    :param argv: command line arguments following 'stats'
+    """
+
+    parser = argparse.ArgumentParser(prog='spellcheck stats',
+                                     description='''Report the structure and memory of the dictionary Trie.''')
+    parser.add_argument('d', type=str, help='The dictionary file.')
+    parser.add_argument('--json', action='store_true', help='Print the statistics as JSON.')
+    args = parser.parse_args(argv)
+
+    dictionary = ProcessFiles(args.d).process_input()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    trie = SpellCheck(dictionary, cache_size=0).words
+    build_time = time.perf_counter() - start
+    traced = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    stats = trie.stats()
+    stats['traced_bytes'] = traced
+    stats['build_seconds'] = build_time
+
+    if args.json:
+        print(json.dumps(stats, indent=2))
+        return
+
+    print('{} nodes, {} terminals, {} words'.format(stats['nodes'], stats['terminals'], len(dictionary)))
+    print('branching factor: ' + ', '.join('{}: {}'.format(children, nodes)
+                                           for children, nodes in stats['branching'].items()))
+    print('depth: ' + ', '.join('{}: {}'.format(depth, nodes) for depth, nodes in stats['depths'].items()))
+    for kind, size in stats['bytes'].items():
+        print('{:<9} {:10.1f} MB  {:6.1f} B/node'.format(kind, size / 1e6, size / stats['nodes']))
+    print('traced    {:10.1f} MB during a {:.3f} s build (under tracemalloc)'.format(traced / 1e6, build_time))
+
+
+def backends_command(argv):
+    """
+    The backends_command function implements 'spellcheck backends DICT', which measures every dictionary backend
+    on a dictionary (build time, memory and hit and miss lookup latency) and prints the backend select_backend()
+    picks from these measurements for the given memory budget and query needs.
+    :param argv: command line arguments following 'backends'
+    """
+
+    parser = argparse.ArgumentParser(prog='spellcheck backends',
+                                     description='''Measure the dictionary backends and pick one.''')
+    parser.add_argument('d', type=str, help='The dictionary file.')
+    parser.add_argument('-n', '--lookups', type=int, default=20000, help='The number of hit and of miss lookups.')
+    parser.add_argument('--memory-budget', type=float, metavar='MB', help='The memory the backend may use.')
+    parser.add_argument('--prefix', action='store_true', help='Only consider backends supporting prefix searches.')
+    parser.add_argument('--fuzzy', action='store_true', help='Only consider backends supporting Trie suggestions.')
+    args = parser.parse_args(argv)
+
+    dictionary = ProcessFiles(args.d).process_input()
+    generator = random.Random(0)
+    hits = generator.sample(sorted(dictionary), min(args.lookups, len(dictionary)))
+    misses = [word[:-1] + '0' for word in hits]
+
+    profiles = dict()
+    for name in sorted(TRIE_BACKENDS):
+        # The memory is measured on a separate build, since tracing slows the build down. The dictionary is read
+        # again while tracing, so backends keeping the words themselves are charged for the strings
+        tracemalloc.start()
+        words = SpellCheck(ProcessFiles(args.d).process_input(), name, cache_size=0).words
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del words
+
+        start = time.perf_counter()
+        words = SpellCheck(dictionary, name, cache_size=0).words
+        build_time = time.perf_counter() - start
+
+        lookup_ns = dict()
+        for kind, queries in (('hit', hits), ('miss', misses)):
+            start = time.perf_counter_ns()
+            for word in queries:
+                word in words
+            lookup_ns[kind] = (time.perf_counter_ns() - start) / len(queries)
+
+        profile = BACKEND_PROFILES[name]
+        profiles[name] = dict(profile, bytes_per_word=memory / len(dictionary),
+                              lookup_ns=(lookup_ns['hit'] + lookup_ns['miss']) / 2)
+        print('{:<13} build {:7.3f} s  memory {:7.1f} MB ({:4.0f} B/word)  hit {:6.0f} ns  miss {:6.0f} ns  '
+              'prefix {:<3}  fuzzy {}'.format(name, build_time, memory / 1e6, memory / len(dictionary),
+                                              lookup_ns['hit'], lookup_ns['miss'], 'yes' if profile['prefix'] else 'no',
+                                              'yes' if profile['fuzzy'] else 'no'))
+        del words
+
+    budget = None if args.memory_budget is None else args.memory_budget * 1e6
+    print('selected: ' + select_backend(len(dictionary), budget, args.prefix, args.fuzzy, profiles))
+
+
+def complete_command(argv):
+    """
+    The complete_command function implements 'spellcheck complete DICT PREFIX...', which prints the most frequent
+    completions of each prefix, ranked by the word counts of a corpus, and measures the completion latency.
+    :param argv: command line arguments following 'complete'
+    """
+
+    parser = argparse.ArgumentParser(prog='spellcheck complete',
+                                     description='''Complete prefixes with the most frequent dictionary words.''')
+    parser.add_argument('d', type=str, help='The dictionary file.')
+    parser.add_argument('prefixes', type=str, nargs='+', help='The prefixes to complete.')
+    parser.add_argument('-k', type=int, default=10, help='The number of completions of each prefix.')
+    parser.add_argument('--corpus', type=str, default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                   '2600.txt'),
+                        help='The corpus whose word counts rank the completions.')
+    args = parser.parse_args(argv)
+
+    check_spelling = SpellCheck(ProcessFiles(args.d).process_input(), frequencies=load_frequencies(args.corpus))
+    check_spelling.complete('')
+
+    latencies = []
+    for prefix in args.prefixes:
+        start = time.perf_counter()
+        completions = check_spelling.complete(prefix, args.k)
+        latencies.append(time.perf_counter() - start)
+        print(prefix + ': ' + ', '.join('{} ({})'.format(word, frequency) for word, frequency in completions))
+
+    print(latency_summary(latencies))
+
+
+def benchmark_queries(check_spelling, input_file=None, count=1000):
+    """
+    The benchmark_queries function picks the misspelled words used to measure suggestion lookups: the misspelled
+    words of an input file, or else a replaced letter in random dictionary words (seeded, so runs are comparable).
+    :param check_spelling: SpellCheck holding the dictionary Trie
+    :param input_file: optional input file whose misspelled words are the queries
+    :param count: maximum number of queries
+    :return: list of query words
+    """
+
+    if input_file is not None:
+        return sorted(check_spelling.check_many(ProcessFiles(input_file).process_input()))[:count]
+
+    generator = random.Random(0)
+    words = sorted(check_spelling.words)
+    queries = []
+    for word in generator.sample(words, min(count, len(words))):
+        position = generator.randrange(len(word))
+        queries.append(word[:position] + generator.choice(CORRECTION_LETTERS) + word[position + 1:])
+
+    return queries
+
+
+def measure(function, *args):
+    """
+    The measure function times a single call.
+    :return: duration of the call in seconds
+    """
+
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def latency_summary(latencies):
+    """
+    The latency_summary function describes a list of latencies.
+    :param latencies: list of durations in seconds
+    :return: string with the count, mean, p50 and p99 in milliseconds
+    """
+
+    if not latencies:
+        return '0 lookups'
+
+    latencies = sorted(latencies)
+    return '{} lookups: mean {:.3f} ms, p50 {:.3f} ms, p99 {:.3f} ms'.format(
+        len(latencies), 1000 * sum(latencies) / len(latencies), 1000 * latencies[len(latencies) // 2],
+        1000 * latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))])
+
+
+class SpellCheckServer:
+    """
+    The SpellCheckServer class answers spell checking requests over HTTP/1.1 with asyncio, so the dictionary Trie is
+    built once and shared by every request. Connections are kept alive by default (HTTP/1.0 clients have to ask for
+    it), and pipelined requests are answered in order as they are read off the connection.
+    Every request runs on the event loop, so none of them may be slow: suggestions are limited to distances up to
+    SERVER_MAX_DISTANCE and to the strategies the server was started with, whose indexes are built before it
+    listens (see prepare()) and again by the request changing the dictionary, never by a suggestion request.
+    Routes, all answering JSON:
+    - GET /check?words=a,b or POST /check {"words": [...]}: the misspelled words
+    - GET /suggest?word=a&max_distance=2&strategy=trie or POST /suggest with the same fields: the suggestions
+    - GET /complete?prefix=a&k=10 or POST /complete with the same fields: the most frequent completions
+    - POST /dictionary {"add": [...], "remove": [...]}: applies a delta to the dictionary without rebuilding it
+    - GET /metrics: the instrumentation report and the suggestion cache counters
+    """
+
+    def __init__(self, spell_check, strategies=SERVER_STRATEGIES):
+        self.spell_check = spell_check
+        self.strategies = tuple(strategies)
+
+    def prepare(self):
+        """
+        The prepare function builds the suggestion indexes of the server's strategies for distances up to
+        SERVER_MAX_DISTANCE, dropping the ones made stale by a dictionary change first.
+        """
+
+        self.spell_check.invalidate_if_changed()
+        if 'symspell' in self.strategies:
+            self.spell_check.build_delete_index(SERVER_MAX_DISTANCE)
+        if 'bktree' in self.strategies:
+            self.spell_check.build_bk_tree()
+        if 'batch' in self.strategies:
+            self.spell_check.build_batch_distance()
+
+    async def handle(self, reader, writer):
+        """
+        The handle function serves every request of one connection until the client closes it or asks to.
+        :param reader: asyncio StreamReader of the connection
+        :param writer: asyncio StreamWriter of the connection
+        """
+
+        try:
+            while True:
+                try:
+                    # Lines over the StreamReader limit raise ValueError, so an oversized request line is answered too
+                    request_line = await reader.readline()
+                    if not request_line:
+                        break
+                    method, target, version = request_line.decode('latin-1').split()
+                    headers = dict()
+                    while True:
+                        line = await reader.readline()
+                        if line in (b'\r\n', b'\n', b''):
+                            break
+                        name, _, value = line.decode('latin-1').partition(':')
+                        headers[name.strip().lower()] = value.strip()
+                    body = await reader.readexactly(int(headers.get('content-length', 0)))
+                except (ValueError, asyncio.IncompleteReadError):
+                    self.respond(writer, 400, {'error': 'Malformed request'}, False)
+                    break
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+                status, payload = self.dispatch(method, target, body)
+                self.respond(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def dispatch(self, method, target, body):
+        """
+        The dispatch function routes one request to the SpellCheck.
+        :param method: HTTP method
+        :param target: request target, with its query string
+        :param body: request body
+        :return: (HTTP status, JSON payload) tuple
+        """
+
+        path, _, query = target.partition('?')
+        if method == 'GET':
+            fields = {name: values[-1] for name, values in urllib.parse.parse_qs(query).items()}
+            if 'words' in fields:
+                fields['words'] = fields['words'].split(',')
+        elif method == 'POST':
+            try:
+                fields = json.loads(body or b'{}')
+            except ValueError:
+                return 400, {'error': 'The request body isn\'t valid JSON'}
+            if not isinstance(fields, dict):
+                return 400, {'error': 'The request body must be a JSON object'}
+        else:
+            return 405, {'error': 'Unsupported method ' + method}
+
+        try:
+            if path == '/check':
+                words = [word.lower() for word in self.word_list(fields, 'words')]
+                return 200, {'misspelled': self.spell_check.check_many(words)}
+            elif path == '/suggest':
+                max_distance = int(fields.get('max_distance', SERVER_MAX_DISTANCE))
+                if not 0 <= max_distance <= SERVER_MAX_DISTANCE:
+                    raise ValueError('max_distance must be between 0 and {}'.format(SERVER_MAX_DISTANCE))
+                strategy = fields.get('strategy', 'trie')
+                if strategy not in self.strategies:
+                    raise ValueError('The server answers {} suggestions, not {!r}'.format(', '.join(self.strategies),
+                                                                                           strategy))
+                suggestions = self.spell_check.suggest(self.word(fields, 'word'), max_distance, strategy)
+                return 200, {'suggestions': suggestions}
+            elif path == '/complete':
+                return 200, {'completions': self.spell_check.complete(self.word(fields, 'prefix'),
+                                                                      int(fields.get('k', 10)))}
+            elif path == '/dictionary' and method == 'POST':
+                added = [word.lower() for word in self.word_list(fields, 'add')]
+                removed = [word.lower() for word in self.word_list(fields, 'remove')]
+                removed_count = self.spell_check.update_dictionary(added, removed)
+                self.prepare()
+                return 200, {'removed': removed_count}
+            elif path == '/metrics':
+                return 200, {'metrics': self.spell_check.metrics(), 'cache': self.spell_check.cache_stats(),
+                             'filter': self.spell_check.filter_stats()}
+        except (KeyError, TypeError, ValueError) as error:
+            return 400, {'error': 'Invalid request: ' + str(error)}
+
+        return 404, {'error': 'Unknown path ' + path}
+
+    @staticmethod
+    def word(fields, name):
+        """
+        The word function reads a required string field of a request.
+        :param fields: fields of the request
+        :param name: name of the field
+        :return: the string
+        """
+
+        value = fields[name]
+        if not isinstance(value, str):
+            raise TypeError('{} must be a string'.format(name))
+
+        return value
+
+    @staticmethod
+    def word_list(fields, name):
+        """
+        The word_list function reads an optional field holding a list of strings, empty when it's missing.
+        :param fields: fields of the request
+        :param name: name of the field
+        :return: list of strings
+        """
+
+        value = fields.get(name, [])
+        if not isinstance(value, list) or not all(isinstance(word, str) for word in value):
+            raise TypeError('{} must be a list of strings'.format(name))
+
+        return value
+
+    def respond(self, writer, status, payload, keep_alive):
+        """
+        The respond function writes one JSON response.
+        :param writer: asyncio StreamWriter of the connection
+        :param status: HTTP status
+        :param payload: JSON serializable response body
+        :param keep_alive: whether the connection stays open after this response
+        """
+
+        body = json.dumps(payload).encode('utf-8')
+        writer.write('HTTP/1.1 {} {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\n'
+                     'Connection: {}\r\n\r\n'.format(status, HTTP_REASONS.get(status, ''), len(body),
+                                                    'keep-alive' if keep_alive else 'close').encode('latin-1'))
+        writer.write(body)
+
+    async def serve(self, host='127.0.0.1', port=8080):
+        """
+        The serve function builds the suggestion indexes, then listens on the address until the process is
+        interrupted.
+        :param host: address to listen on, localhost by default
+        :param port: port to listen on
+        """
+
+        self.prepare()
+        server = await asyncio.start_server(self.handle, host, port)
+        print('Serving spell checks on http://{}:{}'.format(host, port))
+        async with server:
+            await server.serve_forever()
+
+
+def serve_command(argv):
+    """
+    The serve_command function implements 'spellcheck serve DICT', which builds the SpellCheck once and answers
+    check and suggest requests over a local HTTP/JSON API (see SpellCheckServer).
+    :param argv: command line arguments following 'serve'
+    """
+
+    parser = argparse.ArgumentParser(prog='spellcheck serve',
+                                     description='''Serve spell checks over a local HTTP/JSON API.''')
+    parser.add_argument('d', type=str, help='The file that you intend to use as the dictionary.')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='The address to listen on.')
+    parser.add_argument('-p', '--port', type=int, default=8080, help='The port to listen on.')
+    parser.add_argument('-b', '--backend', choices=sorted(TRIE_BACKENDS), default='trie',
+                        help='The Trie implementation used to store the dictionary.')
+    parser.add_argument('--index', type=str,
+                        help='A compiled dictionary index to load instead of building the Trie, rebuilt if stale.')
+    parser.add_argument('--corpus', type=str, default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                   '2600.txt'),
+                        help='The corpus whose word counts rank the completions.')
+    parser.add_argument('-s', '--strategies', choices=SUGGESTION_STRATEGIES, nargs='+', default=SERVER_STRATEGIES,
+                        metavar='STRATEGY',
+                        help='The suggestion strategies to answer, among {}. The symspell, bktree and batch indexes '
+                             'are built before serving, which takes time and memory on a large dictionary.'.format(
+                                 ', '.join(SUGGESTION_STRATEGIES)))
+    args = parser.parse_args(argv)
+
+    try:
+        frequencies = load_frequencies(args.corpus)
+        if args.index is not None:
+            check_spelling = SpellCheck((), words=load_index(args.d, args.index), frequencies=frequencies)
+        else:
+            check_spelling = SpellCheck(ProcessFiles(args.d).load_dictionary(), args.backend, frequencies=frequencies)
+    except (OSError, ValueError) as error:
+        print(error)
+        sys.exit()
+
+    try:
+        asyncio.run(SpellCheckServer(check_spelling, args.strategies).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+COMMANDS = {
+    'compile': compile_command,
+    'symspell': symspell_command,
+    'bktree': bktree_command,
+    'serve': serve_command,
+    'complete': complete_command,
+    'backends': backends_command,
+    'stats': stats_command,
+}
+
+
+def main():
+    """
+    The main function directs the sequence of operations in this script.
+
+    Firstly, the input file and dictionary file are accepted into the ProcessFiles class to be processed,
+    then the outputs are sent over to the SpellCheck class.
+
+    The SpellCheck class then calls the spellcheck() function which compares the words in the
+    input file against the words in the dictionary file to determine misspellings.
+
+    :return: all input file words not found in the dictionary file
+    """
+
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        COMMANDS[sys.argv[1]](sys.argv[2:])
+        sys.exit()
+
+    args = command_line_help()
+
+    if args.i is None or args.d is None:
+        print('Please input the input files and dictionary files!')
+        sys.exit()
+    else:
+        instrumentation = Instrumentation([METRICS_SINKS[args.metrics]()] if args.metrics != 'none' else [])
+        input_processing = ProcessFiles(args.i, instrumentation)
+        dictionary_processing = ProcessFiles(args.d, instrumentation)
+
+        if args.index is not None:
+            # A compiled index replaces the format check, the dictionary parsing and the Trie build
+            try:
+                with instrumentation.span('load index') as span:
+                    index = load_index(args.d, args.index)
+                    span.count = index.word_count
+            except ValueError as error:
+                print(error)
+                sys.exit()
+
+        else:
+            print('Checking file format correctness!')
+
+            # The format is checked while the dictionary is loaded, so the dictionary file is only read once
+            try:
+                with instrumentation.span('load dictionary') as span:
+                    if args.quick_check is not None:
+                        dictionary_processing.check_file_format(args.quick_check)
+                        processed_dictionary = dictionary_processing.load_dictionary(validate=False)
+                    else:
+                        processed_dictionary = dictionary_processing.load_dictionary()
+                    span.count = len(processed_dictionary)
+
+            except DictionaryFormatError as error:
+                print(error)
+                print('The dictionary file hasn\'t been formatted properly, please format your file correctly!')
+                sys.exit()
+
+        print('Checking input words against dictionary!\n')
+
+        # With several jobs, the workers read and tokenize the input file themselves
+        if not args.positions and args.jobs <= 1:
+            processed_input = input_processing.process_input()
+
+            # Correcting for all digits and ordinal numbers in the input text
+            with instrumentation.span('filter digits', len(processed_input)):
+                processed_input = [word for word in processed_input if not re.match(r'\d+', word)]
+
+        if args.index is not None:
+            check_spelling = SpellCheck((), words=index, instrumentation=instrumentation, filter_rate=args.filter,
+                                        hit_set_size=args.hit_set)
+        else:
+            if args.backend == 'auto':
+                budget = None if args.memory_budget is None else args.memory_budget * 1e6
+                args.backend = select_backend(len(processed_dictionary), budget)
+            check_spelling = SpellCheck(processed_dictionary, args.backend, instrumentation=instrumentation,
+                                        filter_rate=args.filter, hit_set_size=args.hit_set)
+
+        if isinstance(check_spelling.words, DAWG):
+            print(check_spelling.words.report() + '\n')
+
+        if args.positions:
+            if args.correct is not None:
+                check_spelling.frequencies = load_frequencies(args.correct)
+
+            # Occurrences are streamed from the input file, so digits are skipped as they come
+            occurrences = (occurrence for occurrence in input_processing.positions()
+                           if not occurrence[0][0].isdecimal())
+            with instrumentation.span('stream check') as span:
+                for word, line, column, byte_offset in check_spelling.check_stream(occurrences):
+                    span.count += 1
+                    report = '{}:{}:{}: {} (byte {})'.format(args.i, line, column, word, byte_offset)
+                    if args.correct is not None:
+                        report += ' -> ' + check_spelling.correct(word)
+                    print(report)
+
+            sys.exit()
+
+        # Misspellings are printed in sorted order, so the output is the same for any number of jobs
+        if args.jobs > 1:
+            with instrumentation.span('parallel check') as span:
+                incorrect_words = check_parallel(check_spelling, args.i, args.jobs)
+                span.count = len(incorrect_words)
+        else:
+            incorrect_words = sorted(check_spelling.check_many(processed_input))
+
+        if (args.filter is not None or args.hit_set) and args.metrics != 'none' and args.jobs <= 1:
+            print('filter: ' + json.dumps(check_spelling.filter_stats()), file=sys.stderr)
+
+        if args.correct is not None:
+            check_spelling.frequencies = load_frequencies(args.correct)
+            for word in incorrect_words:
+                print(word + ' -> ' + check_spelling.correct(word))
+
+        else:
+            for word in incorrect_words:
+                print(word)
+
+        sys.exit()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,84 @@
+"""
+Compares BatchEditDistance with damerau_levenshtein() on random words.
+"""
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spellcheck import BatchEditDistance, SpellCheck, damerau_levenshtein, numpy
+
+
+def random_words(generator, count, alphabet='abcde', longest=8):
+    """
+    The random_words function draws words over a small alphabet, so transpositions and repeated letters are common.
+    :param generator: random.Random instance
+    :param count: number of words
+    :param alphabet: letters of the words
+    :param longest: largest word length
+    :return: list of words, possibly empty ones
+    """
+
+    return [''.join(generator.choice(alphabet) for _ in range(generator.randint(0, longest))) for _ in range(count)]
+
+
+@unittest.skipIf(numpy is None, 'BatchEditDistance needs NumPy')
+class BatchEditDistanceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.generator = random.Random(2600)
+        self.words = random_words(self.generator, 300) + ['']
+        self.queries = random_words(self.generator, 40) + ['', 'xyz', 'axbzc', 'ba', 'abcdeabcde']
+
+    def assert_matches(self, batch, queries):
+        for query, row in zip(queries, batch.distances_many(queries)):
+            self.assertEqual([damerau_levenshtein(query, word) for word in self.words], row.tolist(), query)
+
+    def test_distances(self):
+        batch = BatchEditDistance(self.words)
+        for query in self.queries:
+            expected = [damerau_levenshtein(query, word) for word in self.words]
+            self.assertEqual(expected, batch.distances(query).tolist(), query)
+
+    def test_distances_many(self):
+        self.assert_matches(BatchEditDistance(self.words), self.queries)
+
+    def test_chunk_boundaries(self):
+        queries = self.queries[-8:]
+        for chunk_size in (1, 2, 7, len(self.words) - 1, len(self.words)):
+            self.assert_matches(BatchEditDistance(self.words, chunk_size), queries)
+
+    def test_only_empty_words(self):
+        self.words = ['', '']
+        self.assert_matches(BatchEditDistance(self.words), ['', 'a', 'ab'])
+
+    def test_no_words(self):
+        self.assertEqual((2, 0), BatchEditDistance([]).distances_many(['a', '']).shape)
+
+    def test_within(self):
+        batch = BatchEditDistance(self.words, 16)
+        for query in self.queries:
+            expected = sorted({(word, damerau_levenshtein(query, word)) for word in self.words
+                               if damerau_levenshtein(query, word) <= 2}, key=lambda pair: (pair[1], pair[0]))
+            self.assertEqual(expected, sorted(set(batch.within(query, 2)), key=lambda pair: (pair[1], pair[0])))
+
+    def test_batch_strategy(self):
+        words = [word for word in set(self.words) if word]
+        check_spelling = SpellCheck(words)
+        for query in self.queries:
+            for max_distance in (1, 2):
+                self.assertEqual(check_spelling.suggest(query, max_distance, 'trie'),
+                                 check_spelling.suggest(query, max_distance, 'batch'), query)
+
+    def test_batch_strategy_invalidation(self):
+        check_spelling = SpellCheck(['abc', 'abd'])
+        self.assertEqual([('abc', 1), ('abd', 1)], check_spelling.suggest('abx', 1, 'batch'))
+        check_spelling.update_dictionary(added=['abx'])
+        self.assertEqual([('abx', 0), ('abc', 1), ('abd', 1)], check_spelling.suggest('abx', 1, 'batch'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+"""
+Checks the false positive rates accepted by BloomFilter and the --filter option.
+"""
+
+import argparse
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spellcheck import BloomFilter, SpellCheck, false_positive_rate
+
+
+class BloomFilterTest(unittest.TestCase):
+
+    def test_rejects_rates_outside_zero_and_one(self):
+        for rate in (0, 0.0, -0.1, 1, 1.5, float('nan')):
+            with self.assertRaises(ValueError, msg=rate):
+                BloomFilter(100, rate)
+
+    def test_spell_check_rejects_rate(self):
+        with self.assertRaises(ValueError):
+            SpellCheck(['apple', 'pear'], filter_rate=0)
+
+    def test_command_line_rate(self):
+        self.assertEqual(0.01, false_positive_rate('0.01'))
+        for value in ('0', '-0.5', '1', '2', 'nan', 'inf'):
+            with self.assertRaises(argparse.ArgumentTypeError, msg=value):
+                false_positive_rate(value)
+
+    def test_no_false_negatives(self):
+        generator = random.Random(2600)
+        words = {''.join(generator.choice('abcdefgh') for _ in range(generator.randint(1, 8))) for _ in range(2000)}
+        for rate in (0.5, 0.01, 0.0001):
+            bloom_filter = BloomFilter(len(words), rate)
+            for word in words:
+                bloom_filter.add(word)
+            self.assertTrue(all(word in bloom_filter for word in words), rate)
+
+    def test_filtered_check_matches_trie(self):
+        check_spelling = SpellCheck(['apple', 'pear', 'plum'], filter_rate=0.01)
+        self.assertEqual(['appel', 'peach'], check_spelling.check_many(['apple', 'appel', 'peach', 'plum']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+Compares Trie.complete() and SpellCheck.complete() with a brute force ranking on random words and deltas.
+"""
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spellcheck import SpellCheck, Trie, WordFrequencies
+
+
+def brute_force(frequencies, words, prefix, k):
+    """
+    The brute_force function ranks every word starting with the prefix by frequency, then alphabetically.
+    :param frequencies: mapping of words to their frequency
+    :param words: the dictionary words
+    :param prefix: the beginning of the words
+    :param k: number of completions
+    :return: list of (word, frequency) tuples
+    """
+
+    ranked = sorted((-frequencies.get(word, 0), word) for word in words if word.startswith(prefix))
+    return [(word, -priority) for priority, word in ranked[:k]]
+
+
+class CompleteTest(unittest.TestCase):
+
+    def setUp(self):
+        self.generator = random.Random(2600)
+
+    def random_words(self, count):
+        return [''.join(self.generator.choice('abcd') for _ in range(self.generator.randint(1, 5)))
+                for _ in range(count)]
+
+    def random_frequencies(self, words):
+        # Small counts, so ties between words and between a word and its extensions are common
+        return {word: self.generator.randint(0, 4) for word in words}
+
+    def assert_completions(self, complete, frequencies, words):
+        for prefix in [''] + self.random_words(15):
+            for k in (1, 3, 100):
+                self.assertEqual(brute_force(frequencies, words, prefix, k), complete(prefix, k), (prefix, k))
+
+    def assert_best(self, trie, frequencies, words):
+        # The highest frequency below each Node is the highest frequency of the words it leads to
+        stack = [('', trie.root)]
+        while stack:
+            prefix, node = stack.pop()
+            expected = max([frequencies.get(word, 0) for word in words if word.startswith(prefix)], default=0)
+            self.assertEqual(expected, node.best, prefix)
+            for letter, child in node.items():
+                stack.append((prefix + letter, child))
+
+    def test_trie_add_and_remove(self):
+        trie = Trie()
+        words = set()
+        frequencies = dict()
+        for _ in range(300):
+            word = self.random_words(1)[0]
+            if self.generator.random() < 0.6:
+                # A word keeps its frequency when it's added again, as with the counts of a corpus
+                trie.add(word, frequencies.setdefault(word, self.generator.randint(0, 4)))
+                words.add(word)
+            else:
+                trie.remove(word)
+                words.discard(word)
+            self.assert_best(trie, frequencies, words)
+        self.assert_completions(trie.complete, frequencies, words)
+
+    def test_set_frequencies(self):
+        words = set(self.random_words(200))
+        trie = Trie()
+        for word in words:
+            trie.add(word, 7)
+        frequencies = self.random_frequencies(words)
+        trie.set_frequencies(frequencies)
+        self.assert_best(trie, frequencies, words)
+        self.assert_completions(trie.complete, frequencies, words)
+
+    def test_spell_check_updates(self):
+        words = set(self.random_words(100))
+        frequencies = self.random_frequencies(set(self.random_words(300)) | words)
+        check_spelling = SpellCheck(sorted(words), frequencies=WordFrequencies(frequencies))
+        for _ in range(40):
+            added = self.random_words(self.generator.randint(0, 5))
+            removed = self.generator.sample(sorted(words), min(len(words), self.generator.randint(0, 5)))
+            check_spelling.update_dictionary(added, removed)
+            words = (words - set(removed)) | set(added)
+            self.assert_completions(check_spelling.complete, check_spelling.frequencies.counts, words)
+
+        frequencies = self.random_frequencies(words)
+        check_spelling.frequencies = WordFrequencies(frequencies)
+        self.assert_completions(check_spelling.complete, frequencies, words)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Checks the dictionary index files written by DoubleArrayTrie.save() and read by DoubleArrayTrie.load() and
+load_index().
+"""
+
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spellcheck import INDEX_HEADER, DoubleArrayTrie, compile_index, file_checksum, load_index
+
+
+class IndexTest(unittest.TestCase):
+
+    def setUp(self):
+        generator = random.Random(2600)
+        self.words = {''.join(generator.choice('abcdefghéß') for _ in range(generator.randint(1, 9)))
+                      for _ in range(2000)}
+        self.directory = tempfile.mkdtemp()
+        self.dictionary_file = os.path.join(self.directory, 'dictionary')
+        self.index_file = os.path.join(self.directory, 'dictionary.idx')
+        self.write_dictionary(sorted(self.words))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_dictionary(self, words):
+        with open(self.dictionary_file, 'w', encoding='utf-8') as file:
+            file.write('\n'.join(words) + '\n')
+
+    def load_index(self):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            trie = load_index(self.dictionary_file, self.index_file)
+        return trie, stderr.getvalue()
+
+    def test_round_trip(self):
+        trie = DoubleArrayTrie()
+        for word in self.words:
+            trie.add(word)
+        trie.save(self.index_file, 1234)
+
+        loaded = DoubleArrayTrie.load(self.index_file)
+        self.assertEqual(self.words, set(loaded))
+        self.assertEqual((len(self.words), 1234), (loaded.word_count, loaded.source_checksum))
+        self.assertTrue(all(word in loaded for word in self.words))
+        for word in ('', 'z', 'abcdefghij', 'ab0'):
+            self.assertEqual(word in self.words, word in loaded, word)
+
+    def test_builds_missing_index(self):
+        trie, messages = self.load_index()
+        self.assertIn('Building dictionary index', messages)
+        self.assertEqual(self.words, set(trie))
+
+        trie, messages = self.load_index()
+        self.assertEqual('', messages)
+        self.assertEqual(file_checksum(self.dictionary_file), trie.source_checksum)
+
+    def test_rebuilds_stale_index(self):
+        compile_index(self.dictionary_file, self.index_file)
+        self.write_dictionary(sorted(self.words | {'zebra'}))
+
+        trie, messages = self.load_index()
+        self.assertIn('Rebuilding stale dictionary index', messages)
+        self.assertIn('zebra', trie)
+        self.assertEqual(file_checksum(self.dictionary_file), trie.source_checksum)
+
+    def corrupt(self, offset=None, data=b'', size=None):
+        compile_index(self.dictionary_file, self.index_file)
+        with open(self.index_file, 'r+b') as file:
+            if offset is not None:
+                file.seek(offset)
+                file.write(data)
+            if size is not None:
+                file.truncate(size)
+
+    def test_rejects_truncated_file(self):
+        compile_index(self.dictionary_file, self.index_file)
+        full_size = os.path.getsize(self.index_file)
+        for size in (0, INDEX_HEADER.size - 1, INDEX_HEADER.size + 4, full_size - 1):
+            self.corrupt(size=size)
+            with self.assertRaises(ValueError, msg=size):
+                DoubleArrayTrie.load(self.index_file)
+
+    def test_rejects_bad_magic_and_version(self):
+        for offset, data in ((0, b'XXXX'), (4, b'\x63\x00')):
+            self.corrupt(offset, data)
+            with self.assertRaises(ValueError, msg=data):
+                DoubleArrayTrie.load(self.index_file)
+
+    def test_rebuilds_corrupt_index(self):
+        self.corrupt(0, b'XXXX')
+        trie, messages = self.load_index()
+        self.assertIn('Rebuilding stale dictionary index', messages)
+        self.assertEqual(self.words, set(trie))
+
+
+if __name__ == '__main__':
+    unittest.main()
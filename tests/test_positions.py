@@ -0,0 +1,72 @@
+"""
+Compares ProcessFiles.positions() with positions computed over the whole text, for CRLF and multibyte input.
+"""
+
+import locale
+import os
+import random
+import re
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spellcheck import ProcessFiles, SpellCheck
+
+LINES = ['plain ascii line', 'crlf line\r', 'naïve café Straße', '東京 タワー and 🙂emoji', '', '\r',
+         '  indented\tword_with_underscore 42nd', 'İstanbul ǅemal']
+
+
+def expected_positions(text):
+    """
+    The expected_positions function locates every word of the text from scratch.
+    :param text: the whole text
+    :return: list of (word, line, column, byte offset) tuples
+    """
+
+    positions = []
+    for match in re.finditer(r'\w+', text):
+        start = match.start()
+        line_start = text.rfind('\n', 0, start) + 1
+        positions.append((match.group().lower(), text.count('\n', 0, start) + 1, start - line_start + 1,
+                          len(text[:start].encode('utf-8'))))
+    return positions
+
+
+@unittest.skipUnless(locale.getpreferredencoding(False).lower().replace('-', '') == 'utf8',
+                     'The test text is written in UTF-8')
+class PositionsTest(unittest.TestCase):
+
+    def setUp(self):
+        generator = random.Random(2600)
+        lines = LINES + [generator.choice(LINES) for _ in range(60)]
+        self.text = '\n'.join(lines) + '\r\n'
+        handle, self.path = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(handle, 'w', encoding='utf-8', newline='') as file:
+            file.write(self.text)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_chunk_boundaries(self):
+        expected = expected_positions(self.text)
+        for chunk_size in (1, 2, 3, 5, 8, 13, 100, 1 << 16):
+            self.assertEqual(expected, list(ProcessFiles(self.path).positions(chunk_size)), chunk_size)
+
+    def test_byte_offsets_point_at_words(self):
+        with open(self.path, 'rb') as file:
+            data = file.read()
+        for word, line, column, byte_offset in ProcessFiles(self.path).positions(7):
+            self.assertEqual(word, re.match(r'\w+', data[byte_offset:].decode('utf-8')).group().lower(),
+                             (line, column))
+
+    def test_check_stream(self):
+        check_spelling = SpellCheck(['plain', 'ascii', 'line', 'crlf', 'naïve', 'café', 'and'])
+        misspelled = list(check_spelling.check_stream(ProcessFiles(self.path).positions(5)))
+        self.assertEqual([position for position in expected_positions(self.text)
+                          if position[0] not in check_spelling.words], misspelled)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+"""
+Checks the request validation of SpellCheckServer.dispatch() and the suggestion indexes it keeps ready.
+"""
+
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spellcheck import SpellCheck, SpellCheckServer
+
+
+class SpellCheckServerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = SpellCheckServer(SpellCheck(['apple', 'apply', 'pear']), ('trie', 'symspell'))
+        self.server.prepare()
+
+    def post(self, path, fields):
+        return self.server.dispatch('POST', path, json.dumps(fields).encode('utf-8'))
+
+    def test_rejects_wrong_types(self):
+        for path, fields in (('/check', {'words': [1]}), ('/check', {'words': 'apple'}), ('/suggest', {'word': 1}),
+                             ('/complete', {'prefix': []}), ('/dictionary', {'add': [None]})):
+            self.assertEqual(400, self.post(path, fields)[0], (path, fields))
+
+    def test_rejects_large_distances(self):
+        for max_distance in (-1, 3, 7):
+            status, payload = self.server.dispatch('GET', '/suggest?word=aple&max_distance={}'.format(max_distance), b'')
+            self.assertEqual(400, status, payload)
+        self.assertEqual(2, self.server.spell_check.delete_index.max_distance)
+
+    def test_rejects_strategies_not_served(self):
+        self.assertEqual(400, self.post('/suggest', {'word': 'aple', 'strategy': 'bktree'})[0])
+        self.assertIsNone(self.server.spell_check.bk_tree)
+
+    def test_suggest(self):
+        for strategy in ('trie', 'symspell'):
+            status, payload = self.post('/suggest', {'word': 'aple', 'max_distance': 1, 'strategy': strategy})
+            self.assertEqual((200, [('apple', 1)]), (status, payload['suggestions']))
+
+    def test_dictionary_update_rebuilds_indexes(self):
+        delete_index = self.server.spell_check.delete_index
+        self.assertEqual(200, self.post('/dictionary', {'add': ['Aple']})[0])
+        self.assertIsNotNone(self.server.spell_check.delete_index)
+        self.assertIsNot(delete_index, self.server.spell_check.delete_index)
+        status, payload = self.post('/suggest', {'word': 'aple', 'max_distance': 0, 'strategy': 'symspell'})
+        self.assertEqual([('aple', 0)], payload['suggestions'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+"""
+Compares ProcessFiles.tokens() with re.findall() over the whole text, across chunk and byte range boundaries.
+"""
+
+import locale
+import os
+import random
+import re
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spellcheck import ProcessFiles
+
+TEXT = ('İstanbul and ISTANBUL, naïve café-goers; Straße\r\nfoo_bar 42nd 3.14 ΣΊΣΥΦΟΣ\n'
+        'éclair 東京タワー 🙂 emoji🙂word  tabs\tand nbsp ǅemal ﬁne\n')
+
+
+@unittest.skipUnless(locale.getpreferredencoding(False).lower().replace('-', '') == 'utf8',
+                     'The test text is written in UTF-8')
+class TokensTest(unittest.TestCase):
+
+    def setUp(self):
+        generator = random.Random(2600)
+        words = re.findall(r'\S+|\s+', TEXT)
+        self.text = TEXT + ''.join(generator.choice(words) for _ in range(400))
+        handle, self.path = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(handle, 'w', encoding='utf-8', newline='') as file:
+            file.write(self.text)
+        self.expected = [word.lower() for word in re.findall(r'\w+', self.text)]
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_chunk_boundaries(self):
+        for chunk_size in (1, 2, 3, 4, 5, 7, 16, 61, 1 << 16):
+            self.assertEqual(self.expected, list(ProcessFiles(self.path).tokens(chunk_size)), chunk_size)
+
+    def test_dotted_capital_i(self):
+        self.assertIn('i̇stanbul', self.expected)
+        self.assertNotIn('stanbul', self.expected)
+
+    def test_byte_ranges(self):
+        processing = ProcessFiles(self.path)
+        for count in (1, 2, 3, 8, 50):
+            tokens = [word for start, stop in processing.byte_ranges(count)
+                      for word in processing.tokens(5, start, stop)]
+            self.assertEqual(self.expected, tokens, count)
+
+    def test_process_input(self):
+        self.assertEqual(set(self.expected), ProcessFiles(self.path).process_input())
+
+
+if __name__ == '__main__':
+    unittest.main()
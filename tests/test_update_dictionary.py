@@ -0,0 +1,90 @@
+"""
+Compares Trie.remove() and SpellCheck.update_dictionary() with a plain set on random sequences of deltas.
+"""
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spellcheck import SpellCheck, Trie
+
+
+def trie_nodes(root):
+    """
+    The trie_nodes function walks every Node below root, root included.
+    :param root: the root Node of a Trie
+    :return: generator of (prefix, Node) tuples
+    """
+
+    stack = [('', root)]
+    while stack:
+        prefix, node = stack.pop()
+        yield prefix, node
+        for letter, child in node.items():
+            stack.append((prefix + letter, child))
+
+
+class UpdateDictionaryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.generator = random.Random(2600)
+
+    def random_words(self, count):
+        return [''.join(self.generator.choice('abc') for _ in range(self.generator.randint(0, 5)))
+                for _ in range(count)]
+
+    def assert_trie_matches(self, trie, expected):
+        self.assertEqual(sorted(expected), sorted(trie))
+        for word in self.random_words(50):
+            self.assertEqual(word in expected, word in trie, word)
+
+        # Pruning leaves exactly one Node per prefix of a remaining word, so no Node is a dead end
+        prefixes = {word[:length] for word in expected for length in range(len(word) + 1)} | {''}
+        nodes = dict(trie_nodes(trie.root))
+        self.assertEqual(prefixes, set(nodes))
+        for prefix, node in nodes.items():
+            self.assertTrue(node.end or node.children or prefix == '', prefix)
+
+    def test_remove(self):
+        trie = Trie()
+        expected = set()
+        for _ in range(500):
+            word = self.random_words(1)[0]
+            if self.generator.random() < 0.5:
+                trie.add(word)
+                expected.add(word)
+            else:
+                self.assertEqual(word in expected, trie.remove(word), word)
+                expected.discard(word)
+            self.assert_trie_matches(trie, expected)
+
+    def test_update_dictionary(self):
+        words = set(self.random_words(60))
+        check_spelling = SpellCheck(sorted(words), filter_rate=0.01, hit_set_size=20)
+        for _ in range(200):
+            added = self.random_words(self.generator.randint(0, 4))
+            removed = self.random_words(self.generator.randint(0, 4))
+            version = check_spelling.words.version
+            removed_count = len(words & set(removed))
+            self.assertEqual(removed_count, check_spelling.update_dictionary(added, removed))
+            self.assertEqual(bool(added or removed_count), check_spelling.words.version != version)
+            words = (words - set(removed)) | set(added)
+            self.assert_trie_matches(check_spelling.words, words)
+
+            # The Bloom filter and hit set are patched in place, so checks agree with the set
+            queries = self.random_words(20)
+            self.assertEqual([word for word in queries if word not in words], check_spelling.check_many(queries))
+
+    def test_suggestions_follow_updates(self):
+        check_spelling = SpellCheck(['apple', 'apply'])
+        self.assertEqual([('apple', 1), ('apply', 1)], check_spelling.suggest('appla', 1, 'symspell'))
+        check_spelling.update_dictionary(added=['appla'], removed=['apply'])
+        for strategy in ('trie', 'symspell', 'bktree', 'automaton'):
+            self.assertEqual([('appla', 0), ('apple', 1)], check_spelling.suggest('appla', 1, strategy), strategy)
+
+
+if __name__ == '__main__':
+    unittest.main()